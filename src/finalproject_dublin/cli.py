@@ -1,24 +1,35 @@
 from __future__ import annotations
 
-import json
+import atexit
+import os
 import shlex
+import sys
 import time
-from functools import wraps
+from functools import lru_cache, wraps
 from pathlib import Path
+from typing import Callable, Iterator
 
+import orjson
 from prettytable import PrettyTable
 
 DATA_FILE = Path("wallet.json")
+FLUSH_EVERY_COMMANDS = 10
+FLUSH_INTERVAL_SECONDS = 5.0
+_EXIT_COMMANDS = frozenset(("exit", "quit"))
 
 
 def timed(func):
     """Decorator that prints command execution time."""
 
+    if not __debug__:
+        # Timing output is a development aid; python -O skips the wrapper.
+        return func
+
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start = time.time()
+        start = time.perf_counter_ns()
         result = func(*args, **kwargs)
-        duration = (time.time() - start) * 1000
+        duration = (time.perf_counter_ns() - start) / 1_000_000
         print(f"[timing] {func.__name__}: {duration:.2f} ms")
         return result
 
@@ -39,34 +50,36 @@ def confirm_action(func):
     return wrapper
 
 
-def make_rate_cache():
-    """Closure-based cache for exchange rates."""
+@lru_cache(maxsize=256)
+def _normalize_code(currency: str) -> str:
+    return sys.intern(currency.upper())
 
-    cache: dict[tuple[str, str], float] = {}
 
-    def get_rate(from_currency: str, to_currency: str) -> float:
-        key = (from_currency.upper(), to_currency.upper())
-        if key not in cache:
-            # Temporary static rates for initial project stage.
-            static_rates = {
-                ("USD", "EUR"): 0.93,
-                ("EUR", "USD"): 1.07,
-                ("USD", "RUB"): 90.0,
-                ("RUB", "USD"): 1 / 90.0,
-            }
-            if key not in static_rates:
-                raise ValueError(f"Курс для {key[0]}->{key[1]} не найден")
-            cache[key] = static_rates[key]
-        return cache[key]
+# Temporary static rates for initial project stage.
+_STATIC_RATES: dict[tuple[str, str], float] = {
+    ("USD", "EUR"): 0.93,
+    ("EUR", "USD"): 1.07,
+    ("USD", "RUB"): 90.0,
+    ("RUB", "USD"): 1 / 90.0,
+}
+
 
-    return get_rate
+@lru_cache(maxsize=64)
+def get_rate(from_currency: str, to_currency: str) -> float:
+    """Memoized lookup of exchange rates."""
+    key = (_normalize_code(from_currency), _normalize_code(to_currency))
+    rate = _STATIC_RATES.get(key)
+    if rate is None:
+        raise ValueError(f"Курс для {key[0]}->{key[1]} не найден")
+    return rate
 
 
 class CurrencyWallet:
     def __init__(self, data_file: Path = DATA_FILE):
         self.data_file = data_file
         self.balances: dict[str, float] = {}
-        self._rate_provider = make_rate_cache()
+        self._rate_provider = get_rate
+        self._dirty = False
         self.load()
 
     def load(self) -> None:
@@ -75,15 +88,24 @@ class CurrencyWallet:
             self.save()
             return
         try:
-            with self.data_file.open("r", encoding="utf-8") as f:
-                self.balances = json.load(f)
-        except (json.JSONDecodeError, OSError) as exc:
+            loaded = orjson.loads(self.data_file.read_bytes())
+            self.balances = {
+                sys.intern(code): amount for code, amount in loaded.items()
+            }
+        except (orjson.JSONDecodeError, OSError) as exc:
             print(f"Ошибка загрузки данных: {exc}")
             self.balances = {"USD": 0.0}
 
     def save(self) -> None:
-        with self.data_file.open("w", encoding="utf-8") as f:
-            json.dump(self.balances, f, ensure_ascii=False, indent=2)
+        temp_file = self.data_file.with_name(f"{self.data_file.name}.tmp")
+        temp_file.write_bytes(orjson.dumps(self.balances, option=orjson.OPT_INDENT_2))
+        os.replace(temp_file, self.data_file)
+        self._dirty = False
+
+    def flush(self) -> None:
+        """Persist balances only if they changed since the last write."""
+        if self._dirty:
+            self.save()
 
     def show_balances(self) -> None:
         table = PrettyTable()
@@ -96,28 +118,28 @@ class CurrencyWallet:
     def deposit(self, currency: str, amount: float) -> None:
         if amount <= 0:
             raise ValueError("Сумма пополнения должна быть больше 0")
-        currency = currency.upper()
+        currency = _normalize_code(currency)
         self.balances[currency] = self.balances.get(currency, 0.0) + amount
-        self.save()
+        self._dirty = True
         print(f"Пополнение: +{amount:.2f} {currency}")
 
     @confirm_action
     def withdraw(self, currency: str, amount: float) -> None:
         if amount <= 0:
             raise ValueError("Сумма списания должна быть больше 0")
-        currency = currency.upper()
+        currency = _normalize_code(currency)
         if self.balances.get(currency, 0.0) < amount:
             raise ValueError("Недостаточно средств")
         self.balances[currency] -= amount
-        self.save()
+        self._dirty = True
         print(f"Списание: -{amount:.2f} {currency}")
 
     @confirm_action
     def convert(self, from_currency: str, to_currency: str, amount: float) -> None:
         if amount <= 0:
             raise ValueError("Сумма конвертации должна быть больше 0")
-        from_currency = from_currency.upper()
-        to_currency = to_currency.upper()
+        from_currency = _normalize_code(from_currency)
+        to_currency = _normalize_code(to_currency)
         if self.balances.get(from_currency, 0.0) < amount:
             raise ValueError("Недостаточно средств для конвертации")
 
@@ -126,13 +148,28 @@ class CurrencyWallet:
 
         self.balances[from_currency] -= amount
         self.balances[to_currency] = self.balances.get(to_currency, 0.0) + converted
-        self.save()
+        self._dirty = True
         print(
             f"Конвертация: {amount:.2f} {from_currency} -> "
             f"{converted:.2f} {to_currency}"
         )
 
 
+# command -> (expected number of tokens or None for any, handler)
+_HANDLERS: dict[
+    str, tuple[int | None, Callable[[CurrencyWallet, list[str]], None]]
+] = {
+    "help": (None, lambda wallet, parts: print_help()),
+    "balance": (None, lambda wallet, parts: wallet.show_balances()),
+    "deposit": (3, lambda wallet, parts: wallet.deposit(parts[1], float(parts[2]))),
+    "withdraw": (3, lambda wallet, parts: wallet.withdraw(parts[1], float(parts[2]))),
+    "convert": (
+        4,
+        lambda wallet, parts: wallet.convert(parts[1], parts[2], float(parts[3])),
+    ),
+}
+
+
 @timed
 def process_command(wallet: CurrencyWallet, raw_command: str) -> bool:
     try:
@@ -144,23 +181,17 @@ def process_command(wallet: CurrencyWallet, raw_command: str) -> bool:
     if not parts:
         return True
 
-    command = parts[0].lower()
+    command = sys.intern(parts[0].lower())
+    if command in _EXIT_COMMANDS:
+        return False
+
+    entry = _HANDLERS.get(command)
+    if entry is None or (entry[0] is not None and len(parts) != entry[0]):
+        print("Неизвестная команда или неверное количество аргументов. help")
+        return True
 
     try:
-        if command in {"exit", "quit"}:
-            return False
-        if command == "help":
-            print_help()
-        elif command == "balance":
-            wallet.show_balances()
-        elif command == "deposit" and len(parts) == 3:
-            wallet.deposit(parts[1], float(parts[2]))
-        elif command == "withdraw" and len(parts) == 3:
-            wallet.withdraw(parts[1], float(parts[2]))
-        elif command == "convert" and len(parts) == 4:
-            wallet.convert(parts[1], parts[2], float(parts[3]))
-        else:
-            print("Неизвестная команда или неверное количество аргументов. help")
+        entry[1](wallet, parts)
     except ValueError as exc:
         print(f"Ошибка: {exc}")
 
@@ -183,15 +214,38 @@ def print_help() -> None:
     )
 
 
+def _read_commands() -> Iterator[str]:
+    """Prompt interactively, or stream lines when stdin is piped."""
+    if sys.stdin.isatty():
+        while True:
+            yield input("> ").strip()
+    for line in sys.stdin:
+        yield line.strip()
+
+
 def main() -> None:
     wallet = CurrencyWallet()
+    atexit.register(wallet.flush)
     print("Currency wallet started. Type 'help' for command list.")
 
-    running = True
-    while running:
-        raw = input("> ").strip()
+    commands_since_flush = 0
+    last_flush = time.monotonic()
+    for raw in _read_commands():
         running = process_command(wallet, raw)
 
+        commands_since_flush += 1
+        now = time.monotonic()
+        if (
+            not running
+            or commands_since_flush >= FLUSH_EVERY_COMMANDS
+            or now - last_flush >= FLUSH_INTERVAL_SECONDS
+        ):
+            wallet.flush()
+            commands_since_flush = 0
+            last_flush = now
+        if not running:
+            break
+
 
 if __name__ == "__main__":
     main()
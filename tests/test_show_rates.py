@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import unittest
+from typing import Any
+
+from valutatrade_hub.cli.interface import _parse_top, _show_rates_from_cache
+
+
+class _FakeStorage:
+    def __init__(self, pairs: dict[str, dict[str, Any]]) -> None:
+        self._pairs = pairs
+
+    def read_rates_cache(self) -> dict[str, Any]:
+        return {"pairs": self._pairs}
+
+    def get_pair(self, pair: str) -> dict[str, Any] | None:
+        return self._pairs.get(pair)
+
+    def read_last_refresh(self) -> str:
+        return "2026-10-14T00:00:00Z"
+
+
+def _entry(rate: float) -> dict[str, Any]:
+    return {"rate": rate, "updated_at": "2026-10-14T00:00:00Z"}
+
+
+class ShowRatesFromCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.storage = _FakeStorage(
+            {
+                "BTC_USD": _entry(60000.0),
+                "EUR_USD": _entry(1.1),
+                "USD_RUB": _entry(90.0),
+            }
+        )
+
+    def test_currency_and_base_select_one_pair(self) -> None:
+        output = _show_rates_from_cache(self.storage, "btc", None, "usd")
+        self.assertIn("BTC_USD", output)
+        self.assertNotIn("EUR_USD", output)
+
+    def test_currency_equal_to_base_lists_all_base_pairs(self) -> None:
+        output = _show_rates_from_cache(self.storage, "USD", None, "USD")
+        self.assertIn("BTC_USD", output)
+        self.assertIn("EUR_USD", output)
+        self.assertNotIn("USD_RUB", output)
+
+    def test_missing_pair_raises(self) -> None:
+        with self.assertRaises(ValueError):
+            _show_rates_from_cache(self.storage, "BTC", None, "EUR")
+
+
+class ParseTopTest(unittest.TestCase):
+    def test_positive_value(self) -> None:
+        self.assertEqual(_parse_top("3"), 3)
+
+    def test_rejects_non_positive_and_non_integer(self) -> None:
+        for raw in ("0", "-2", "abc"):
+            with self.subTest(raw=raw), self.assertRaises(ValueError):
+                _parse_top(raw)
+
+
+if __name__ == "__main__":
+    unittest.main()
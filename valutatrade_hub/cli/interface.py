@@ -1,6 +1,11 @@
 from __future__ import annotations
 
+import heapq
 import shlex
+import sys
+from functools import cache
+from operator import itemgetter
+from typing import TYPE_CHECKING, Callable, Iterator
 
 from valutatrade_hub.core.currencies import list_supported_codes
 from valutatrade_hub.core.exceptions import (
@@ -9,35 +14,26 @@ from valutatrade_hub.core.exceptions import (
     InsufficientFundsError,
 )
 from valutatrade_hub.core.usecases import TradingPlatformService
-from valutatrade_hub.logging_config import setup_parser_logging
-from valutatrade_hub.parser_service.api_clients import (
-    CoinGeckoClient,
-    ExchangeRateApiClient,
-)
-from valutatrade_hub.parser_service.config import ParserConfig
-from valutatrade_hub.parser_service.storage import ParserStorage
-from valutatrade_hub.parser_service.updater import RatesUpdater
 
+if TYPE_CHECKING:
+    from valutatrade_hub.parser_service.storage import ParserStorage
+    from valutatrade_hub.parser_service.updater import RatesUpdater
 
-def _parse_named_args(tokens: list[str]) -> dict[str, str]:
-    args: dict[str, str] = {}
-    i = 0
+_RATE_ROW_FORMAT = "- %s: %.8f (updated: %s)"
+_EXIT_COMMANDS = frozenset(("exit", "quit"))
 
-    while i < len(tokens):
-        token = tokens[i]
+
+def _parse_named_args(tokens: list[str]) -> dict[str, str]:
+    flags = tokens[0::2]
+    for token in flags:
         if not token.startswith("--"):
             raise ValueError(f"Неожиданный аргумент: {token}")
-
-        key = token[2:]
-        if not key:
+        if token == "--":
             raise ValueError("Пустое имя аргумента")
-        if i + 1 >= len(tokens):
-            raise ValueError(f"Для аргумента '{token}' не указано значение")
-
-        args[key] = tokens[i + 1]
-        i += 2
+    if len(tokens) % 2:
+        raise ValueError(f"Для аргумента '{tokens[-1]}' не указано значение")
 
-    return args
+    return dict(zip((token[2:] for token in flags), tokens[1::2]))
 
 
 def print_help() -> None:
@@ -61,7 +57,18 @@ def print_help() -> None:
     )
 
 
+@cache
 def _build_parser_updater() -> tuple[RatesUpdater, ParserStorage]:
+    # Parser Service (and `requests`) is only imported once rates are needed.
+    from valutatrade_hub.logging_config import setup_parser_logging
+    from valutatrade_hub.parser_service.api_clients import (
+        CoinGeckoClient,
+        ExchangeRateApiClient,
+    )
+    from valutatrade_hub.parser_service.config import ParserConfig
+    from valutatrade_hub.parser_service.storage import ParserStorage
+    from valutatrade_hub.parser_service.updater import RatesUpdater
+
     config = ParserConfig.from_settings()
     storage = ParserStorage(config)
     logger = setup_parser_logging()
@@ -83,43 +90,104 @@ def _show_rates_from_cache(
             "Выполните 'update-rates', чтобы загрузить данные."
         )
 
-    rows: list[tuple[str, float, str]] = []
-    for pair, data in pairs.items():
-        if not isinstance(data, dict):
-            continue
-        rate = data.get("rate")
-        updated_at = str(data.get("updated_at", ""))
-        if not isinstance(rate, (int, float)):
-            continue
-
-        from_code, to_code = pair.split("_", 1)
-        if currency and currency.upper() not in {from_code, to_code}:
-            continue
-        if base and to_code != base.upper():
-            continue
-        rows.append((pair, float(rate), updated_at))
+    currency_up = currency.upper() if currency else None
+    base_suffix = f"_{base.upper()}" if base else None
+    if (
+        currency_up is not None
+        and base_suffix is not None
+        and currency_up != base_suffix[1:]
+    ):
+        # Distinct currency and base name exactly one pair: look it up
+        # instead of scanning. Equal ones match every *_BASE pair.
+        pair = f"{currency_up}{base_suffix}"
+        entry = storage.get_pair(pair)
+        pairs = {pair: entry} if entry is not None else {}
+    rows = [
+        (pair, float(data["rate"]), str(data.get("updated_at", "")))
+        for pair, data in pairs.items()
+        if isinstance(data, dict)
+        and isinstance(data.get("rate"), (int, float))
+        and (currency_up is None or currency_up in pair.split("_", 1))
+        and (base_suffix is None or pair.endswith(base_suffix))
+    ]
 
     if not rows:
         target = currency or base or "указанных фильтров"
         raise ValueError(f"Курс для '{target}' не найден в кеше.")
 
     if top is not None:
-        rows = sorted(rows, key=lambda item: item[1], reverse=True)[:top]
+        rows = heapq.nlargest(top, rows, key=itemgetter(1))
     else:
-        rows = sorted(rows, key=lambda item: item[0])
+        rows.sort(key=itemgetter(0))
 
-    lines = [f"Rates from cache (updated at {payload.get('last_refresh')}):"]
-    for pair, rate, updated_at in rows:
-        lines.append(f"- {pair}: {rate:.8f} (updated: {updated_at})")
+    lines = [f"Rates from cache (updated at {storage.read_last_refresh()}):"]
+    lines.extend(_RATE_ROW_FORMAT % row for row in rows)
     return "\n".join(lines)
 
 
+def _update_rates(options: dict[str, str]) -> str:
+    updater, _storage = _build_parser_updater()
+    result = updater.run_update(source=options.get("source"))
+    # Storage writes in the background; later commands read rates from disk.
+    updater.flush()
+    if result["errors"]:
+        return "Update completed with errors. Check logs/parser.log for details."
+    return (
+        "Update successful. "
+        f"Total rates updated: {result['updated_count']}. "
+        f"Last refresh: {result['last_refresh']}"
+    )
+
+
+def _parse_top(raw: str) -> int:
+    try:
+        top = int(raw)
+    except ValueError as exc:
+        raise ValueError("'top' должен быть положительным целым числом") from exc
+    if top <= 0:
+        raise ValueError("'top' должен быть положительным целым числом")
+    return top
+
+
+def _show_rates(options: dict[str, str]) -> str:
+    top = _parse_top(options["top"]) if "top" in options else None
+    _updater, storage = _build_parser_updater()
+    return _show_rates_from_cache(
+        storage,
+        options.get("currency"),
+        top,
+        options.get("base"),
+    )
+
+
+_COMMAND_HANDLERS: dict[
+    str, Callable[[TradingPlatformService, dict[str, str]], str]
+] = {
+    "register": lambda service, o: service.register(o["username"], o["password"]),
+    "login": lambda service, o: service.login(o["username"], o["password"]),
+    "show-portfolio": lambda service, o: service.show_portfolio(o.get("base", "USD")),
+    "buy": lambda service, o: service.buy(o["currency"], float(o["amount"])),
+    "sell": lambda service, o: service.sell(o["currency"], float(o["amount"])),
+    "get-rate": lambda service, o: service.get_rate(o["from"], o["to"]),
+    "update-rates": lambda _service, o: _update_rates(o),
+    "show-rates": lambda _service, o: _show_rates(o),
+}
+
+
+def _read_commands() -> Iterator[str]:
+    """Prompt interactively, or stream lines when stdin is piped."""
+    if sys.stdin.isatty():
+        while True:
+            yield input("> ").strip()
+    for line in sys.stdin:
+        yield line.strip()
+
+
 def run_cli() -> None:
     service = TradingPlatformService()
     print("ValutaTrade Hub CLI. Введите 'help' для списка команд.")
 
-    while True:
-        raw = input("> ").strip()
+    for raw in _read_commands():
         if not raw:
             continue
 
@@ -129,10 +197,10 @@ def run_cli() -> None:
             print(f"Ошибка парсинга команды: {exc}")
             continue
 
-        command = parts[0].lower()
+        command = sys.intern(parts[0].lower())
         tokens = parts[1:]
 
-        if command in {"exit", "quit"}:
+        if command in _EXIT_COMMANDS:
             print("Выход.")
             break
 
@@ -140,44 +208,13 @@ def run_cli() -> None:
             print_help()
             continue
 
+        handler = _COMMAND_HANDLERS.get(command)
+        if handler is None:
+            print("Неизвестная команда. Введите 'help'.")
+            continue
+
         try:
-            options = _parse_named_args(tokens)
-
-            if command == "register":
-                print(service.register(options["username"], options["password"]))
-            elif command == "login":
-                print(service.login(options["username"], options["password"]))
-            elif command == "show-portfolio":
-                print(service.show_portfolio(options.get("base", "USD")))
-            elif command == "buy":
-                print(service.buy(options["currency"], float(options["amount"])))
-            elif command == "sell":
-                print(service.sell(options["currency"], float(options["amount"])))
-            elif command == "get-rate":
-                print(service.get_rate(options["from"], options["to"]))
-            elif command == "update-rates":
-                updater, _storage = _build_parser_updater()
-                source = options.get("source")
-                result = updater.run_update(source=source)
-                if result["errors"]:
-                    print(
-                        "Update completed with errors. "
-                        "Check logs/parser.log for details."
-                    )
-                else:
-                    print(
-                        "Update successful. "
-                        f"Total rates updated: {result['updated_count']}. "
-                        f"Last refresh: {result['last_refresh']}"
-                    )
-            elif command == "show-rates":
-                _updater, storage = _build_parser_updater()
-                currency = options.get("currency")
-                base = options.get("base")
-                top = int(options["top"]) if "top" in options else None
-                print(_show_rates_from_cache(storage, currency, top, base))
-            else:
-                print("Неизвестная команда. Введите 'help'.")
+            print(handler(service, _parse_named_args(tokens)))
         except KeyError as exc:
             print(f"Отсутствует обязательный аргумент: --{exc.args[0]}")
         except InsufficientFundsError as exc:
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Callable, Sequence
+
+# Below these sizes the plain loop beats array conversion and dispatch.
+VECTORIZE_MIN_WALLETS = 64
+KERNEL_MIN_WALLETS = 512
+
+
+def total_value(
+    balances: Sequence[float],
+    direct_rates: Sequence[float],
+    reverse_rates: Sequence[float],
+    is_base: Sequence[int],
+) -> float:
+    """Sum balances converted to the base currency.
+
+    For each wallet either ``is_base`` is set, ``reverse_rates`` holds a
+    positive BASE->CODE rate, or ``direct_rates`` holds the CODE->BASE rate.
+    """
+    total = 0.0
+    for i in range(len(balances)):
+        if is_base[i]:
+            total += balances[i]
+        elif reverse_rates[i] > 0:
+            total += balances[i] / reverse_rates[i]
+        else:
+            total += balances[i] * direct_rates[i]
+    return total
+
+
+def dot_total_value(
+    np: Any,
+    balances: Sequence[float],
+    direct_rates: Sequence[float],
+    reverse_rates: Sequence[float],
+    is_base: Sequence[int],
+) -> float:
+    """NumPy variant of total_value(): one np.dot over per-wallet factors."""
+    factors = np.asarray(direct_rates, dtype=np.float64)
+    reverse = np.asarray(reverse_rates, dtype=np.float64)
+    use_reverse = reverse > 0
+    factors[use_reverse] = 1.0 / reverse[use_reverse]
+    factors[np.asarray(is_base, dtype=bool)] = 1.0
+    return float(np.dot(np.asarray(balances, dtype=np.float64), factors))
+
+
+@lru_cache(maxsize=None)
+def load_total_value_kernel() -> Callable[..., float] | None:
+    """Compile the Numba kernel on first use; None without the "fast" extra.
+
+    Imported lazily so that numba never slows down CLI startup. No
+    ``fastmath``: money totals must keep the summation order.
+    """
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+    return njit(
+        "float64(float64[:], float64[:], float64[:], int8[:])",
+        cache=True,
+    )(total_value)
+
+
+@lru_cache(maxsize=None)
+def load_numpy() -> Any | None:
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
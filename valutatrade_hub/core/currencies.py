@@ -1,14 +1,18 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from functools import lru_cache
 
 from valutatrade_hub.core.exceptions import CurrencyNotFoundError
 from valutatrade_hub.core.utils import normalize_currency_code
 
+# Exact-type checks: cheaper than isinstance() on the registry/bulk-load path.
+_NUMBER_TYPES = (int, float)
+
 
 class Currency(ABC):
     def __init__(self, name: str, code: str) -> None:
-        if not isinstance(name, str) or not name.strip():
+        if type(name) is not str or not name.strip():
             raise ValueError("Currency name must be a non-empty string")
         self.name = name.strip()
         self.code = normalize_currency_code(code)
@@ -21,7 +25,7 @@ class Currency(ABC):
 class FiatCurrency(Currency):
     def __init__(self, name: str, code: str, issuing_country: str) -> None:
         super().__init__(name=name, code=code)
-        if not isinstance(issuing_country, str) or not issuing_country.strip():
+        if type(issuing_country) is not str or not issuing_country.strip():
             raise ValueError("Issuing country must be a non-empty string")
         self.issuing_country = issuing_country.strip()
 
@@ -41,9 +45,9 @@ class CryptoCurrency(Currency):
         market_cap: float,
     ) -> None:
         super().__init__(name=name, code=code)
-        if not isinstance(algorithm, str) or not algorithm.strip():
+        if type(algorithm) is not str or not algorithm.strip():
             raise ValueError("Algorithm must be a non-empty string")
-        if not isinstance(market_cap, (int, float)) or float(market_cap) < 0:
+        if type(market_cap) not in _NUMBER_TYPES or market_cap < 0:
             raise ValueError("Market cap must be a non-negative number")
         self.algorithm = algorithm.strip()
         self.market_cap = float(market_cap)
@@ -55,25 +59,38 @@ class CryptoCurrency(Currency):
         )
 
 
+# Keyed by Currency.code, which normalize_currency_code() already interns.
 _CURRENCY_REGISTRY: dict[str, Currency] = {
-    "USD": FiatCurrency("US Dollar", "USD", "United States"),
-    "EUR": FiatCurrency("Euro", "EUR", "Eurozone"),
-    "RUB": FiatCurrency("Russian Ruble", "RUB", "Russia"),
-    "BTC": CryptoCurrency("Bitcoin", "BTC", "SHA-256", 1.12e12),
-    "ETH": CryptoCurrency("Ethereum", "ETH", "Ethash", 4.20e11),
+    currency.code: currency
+    for currency in (
+        FiatCurrency("US Dollar", "USD", "United States"),
+        FiatCurrency("Euro", "EUR", "Eurozone"),
+        FiatCurrency("Russian Ruble", "RUB", "Russia"),
+        CryptoCurrency("Bitcoin", "BTC", "SHA-256", 1.12e12),
+        CryptoCurrency("Ethereum", "ETH", "Ethash", 4.20e11),
+    )
 }
 
+_SUPPORTED_CODES: tuple[str, ...] = tuple(sorted(_CURRENCY_REGISTRY))
+
 
 def get_currency(code: str) -> Currency:
+    # Validation stays outside the cache: unhashable input must raise
+    # CurrencyNotFoundError rather than lru_cache's TypeError.
     try:
         normalized = normalize_currency_code(code)
     except ValueError as exc:
         raise CurrencyNotFoundError(str(code)) from exc
+    return _get_currency_cached(normalized)
+
+
+@lru_cache(maxsize=32)
+def _get_currency_cached(normalized: str) -> Currency:
     currency = _CURRENCY_REGISTRY.get(normalized)
     if currency is None:
         raise CurrencyNotFoundError(normalized)
     return currency
 
 
-def list_supported_codes() -> list[str]:
-    return sorted(_CURRENCY_REGISTRY.keys())
+def list_supported_codes() -> tuple[str, ...]:
+    return _SUPPORTED_CODES
@@ -1,14 +1,37 @@
 from __future__ import annotations
 
-import hashlib
+import hmac
 from datetime import datetime
-from typing import Any
-
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from valutatrade_hub.core._kernels import (
+    KERNEL_MIN_WALLETS,
+    VECTORIZE_MIN_WALLETS,
+    dot_total_value,
+    load_numpy,
+    load_total_value_kernel,
+)
 from valutatrade_hub.core.exceptions import InsufficientFundsError
-from valutatrade_hub.core.utils import normalize_currency_code, validate_amount
+from valutatrade_hub.core.utils import (
+    normalize_currency_code,
+    pair_keys,
+    password_digest,
+    validate_amount,
+)
 
 
 class User:
+    __slots__ = (
+        "_user_id",
+        "_username",
+        "_hashed_password",
+        "_hashed_password_bytes",
+        "_salt",
+        "_salt_bytes",
+        "_registration_date",
+    )
+
     def __init__(
         self,
         user_id: int,
@@ -20,15 +43,12 @@ class User:
         self._user_id = int(user_id)
         self._username = ""
         self._hashed_password = hashed_password
+        self._hashed_password_bytes = bytes.fromhex(hashed_password)
         self._salt = salt
+        self._salt_bytes = salt.encode("utf-8")
         self._registration_date = registration_date
         self.username = username
 
-    @staticmethod
-    def _hash_password(password: str, salt: str) -> str:
-        payload = f"{password}{salt}".encode("utf-8")
-        return hashlib.sha256(payload).hexdigest()
-
     @property
     def user_id(self) -> int:
         return self._user_id
@@ -39,7 +59,7 @@ class User:
 
     @username.setter
     def username(self, value: str) -> None:
-        if not isinstance(value, str) or not value.strip():
+        if type(value) is not str or not value.strip():
             raise ValueError("Имя не может быть пустым")
         self._username = value.strip()
 
@@ -63,12 +83,17 @@ class User:
         }
 
     def change_password(self, new_password: str) -> None:
-        if not isinstance(new_password, str) or len(new_password) < 4:
+        if type(new_password) is not str or len(new_password) < 4:
             raise ValueError("Пароль должен быть не короче 4 символов")
-        self._hashed_password = self._hash_password(new_password, self._salt)
+        digest = password_digest(new_password, self._salt_bytes)
+        self._hashed_password_bytes = digest
+        self._hashed_password = digest.hex()
 
     def verify_password(self, password: str) -> bool:
-        return self._hashed_password == self._hash_password(password, self._salt)
+        return hmac.compare_digest(
+            self._hashed_password_bytes,
+            password_digest(password, self._salt_bytes),
+        )
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -91,6 +116,8 @@ class User:
 
 
 class Wallet:
+    __slots__ = ("_currency_code", "_balance")
+
     def __init__(self, currency_code: str, balance: float = 0.0) -> None:
         self._currency_code = normalize_currency_code(currency_code)
         self._balance = 0.0
@@ -106,7 +133,7 @@ class Wallet:
 
     @balance.setter
     def balance(self, value: float) -> None:
-        if not isinstance(value, (int, float)):
+        if type(value) not in (int, float):
             raise ValueError("Баланс должен быть числом")
         value = float(value)
         if value < 0:
@@ -137,6 +164,8 @@ class Wallet:
 
 
 class Portfolio:
+    __slots__ = ("_user_id", "_wallets", "_wallets_view", "_user", "_serialized")
+
     def __init__(
         self,
         user_id: int,
@@ -145,7 +174,10 @@ class Portfolio:
     ) -> None:
         self._user_id = int(user_id)
         self._wallets: dict[str, Wallet] = wallets or {}
+        self._wallets_view = MappingProxyType(self._wallets)
         self._user = user
+        # Wallet entries as last loaded/serialized; unchanged ones are reused.
+        self._serialized: dict[str, Any] = {}
 
     @property
     def user_id(self) -> int:
@@ -156,8 +188,9 @@ class Portfolio:
         return self._user
 
     @property
-    def wallets(self) -> dict[str, Wallet]:
-        return dict(self._wallets)
+    def wallets(self) -> Mapping[str, Wallet]:
+        """Read-only live view; use add_currency() to add wallets."""
+        return self._wallets_view
 
     def add_currency(self, currency_code: str) -> Wallet:
         normalized = normalize_currency_code(currency_code)
@@ -177,16 +210,19 @@ class Portfolio:
         rates: dict[str, float],
     ) -> float:
         base = normalize_currency_code(base_currency)
-        total = 0.0
+        if len(self._wallets) >= VECTORIZE_MIN_WALLETS:
+            np = load_numpy()
+            if np is not None:
+                return self._array_total_value(np, base, rates)
 
+        total = 0.0
         for wallet in self._wallets.values():
             code = wallet.currency_code
             if code == base:
                 total += wallet.balance
                 continue
 
-            direct_key = f"{code}_{base}"
-            reverse_key = f"{base}_{code}"
+            direct_key, reverse_key = pair_keys(code, base)
 
             if direct_key in rates:
                 total += wallet.balance * rates[direct_key]
@@ -197,14 +233,72 @@ class Portfolio:
 
         return total
 
+    def _array_total_value(
+        self,
+        np: Any,
+        base: str,
+        rates: dict[str, float],
+    ) -> float:
+        """Large-portfolio path: NumPy dot product or the Numba kernel."""
+        balances: list[float] = []
+        direct_rates: list[float] = []
+        reverse_rates: list[float] = []
+        is_base: list[int] = []
+
+        for wallet in self._wallets.values():
+            code = wallet.currency_code
+            balances.append(wallet.balance)
+            if code == base:
+                is_base.append(1)
+                direct_rates.append(0.0)
+                reverse_rates.append(0.0)
+                continue
+
+            direct_key, reverse_key = pair_keys(code, base)
+
+            is_base.append(0)
+            if direct_key in rates:
+                direct_rates.append(rates[direct_key])
+                reverse_rates.append(0.0)
+            elif reverse_key in rates and rates[reverse_key] > 0:
+                direct_rates.append(0.0)
+                reverse_rates.append(rates[reverse_key])
+            else:
+                raise ValueError(f"Неизвестная базовая валюта '{base}'")
+
+        if len(balances) < KERNEL_MIN_WALLETS:
+            kernel = None
+        else:
+            kernel = load_total_value_kernel()
+        if kernel is None:
+            return dot_total_value(
+                np, balances, direct_rates, reverse_rates, is_base
+            )
+        return float(
+            kernel(
+                np.asarray(balances, dtype=np.float64),
+                np.asarray(direct_rates, dtype=np.float64),
+                np.asarray(reverse_rates, dtype=np.float64),
+                np.asarray(is_base, dtype=np.int8),
+            )
+        )
+
     def to_dict(self) -> dict[str, Any]:
-        wallets_payload = {
-            code: {
-                "currency_code": wallet.currency_code,
-                "balance": wallet.balance,
-            }
-            for code, wallet in self._wallets.items()
-        }
+        previous = self._serialized
+        wallets_payload: dict[str, Any] = {}
+        for code, wallet in self._wallets.items():
+            entry = previous.get(code)
+            if (
+                type(entry) is not dict
+                or entry.get("balance") != wallet.balance
+                or entry.get("currency_code") != wallet.currency_code
+            ):
+                entry = {
+                    "currency_code": wallet.currency_code,
+                    "balance": wallet.balance,
+                }
+            wallets_payload[code] = entry
+        self._serialized = wallets_payload
         return {
             "user_id": self._user_id,
             "wallets": wallets_payload,
@@ -225,4 +319,7 @@ class Portfolio:
                 balance=float(wallet_data.get("balance", 0.0)),
             )
 
-        return cls(user_id=int(payload["user_id"]), wallets=wallets, user=user)
+        portfolio = cls(user_id=int(payload["user_id"]), wallets=wallets, user=user)
+        if isinstance(wallets_raw, dict):
+            portfolio._serialized = wallets_raw
+        return portfolio
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import time
 from datetime import datetime
+from typing import Any, Iterable
 
 from valutatrade_hub.core.currencies import get_currency
 from valutatrade_hub.core.exceptions import ApiRequestError
@@ -25,6 +27,7 @@ class TradingPlatformService:
         setup_logging()
         self._settings = SettingsLoader()
         self._db = DatabaseManager()
+        self._rates_ttl_seconds = int(self._settings.get("RATES_TTL_SECONDS", 300))
         self._current_user: User | None = None
         self._action_context: dict[str, object] = {}
 
@@ -39,13 +42,11 @@ class TradingPlatformService:
         if not isinstance(password, str) or len(password) < 4:
             raise ValueError("Пароль должен быть не короче 4 символов")
 
-        users_data = self._db.get_users()
         normalized_username = username.strip()
-
-        if any(item["username"] == normalized_username for item in users_data):
+        if normalized_username in self._db.get_users_by_name():
             raise ValueError(f"Имя пользователя '{normalized_username}' уже занято")
 
-        next_user_id = max((int(item["user_id"]) for item in users_data), default=0) + 1
+        next_user_id = self._db.get_max_user_id() + 1
         salt = generate_salt()
         hashed_password = hash_password(password, salt)
 
@@ -57,12 +58,9 @@ class TradingPlatformService:
             registration_date=datetime.now(),
         )
 
-        users_data.append(user.to_dict())
-        self._db.save_users(users_data)
-
-        portfolios_data = self._db.get_portfolios()
-        portfolios_data.append(Portfolio(user_id=next_user_id).to_dict())
-        self._db.save_portfolios(portfolios_data)
+        self._db.add_user(user.to_dict())
+        self._db.upsert_portfolio(Portfolio(user_id=next_user_id).to_dict())
+        self._db.flush()
 
         self._action_context = {
             "currency_code": "-",
@@ -78,11 +76,7 @@ class TradingPlatformService:
 
     @log_action("LOGIN")
     def login(self, username: str, password: str) -> str:
-        users_data = self._db.get_users()
-        payload = next(
-            (item for item in users_data if item["username"] == username),
-            None,
-        )
+        payload = self._db.get_users_by_name().get(username)
 
         if payload is None:
             raise ValueError(f"Пользователь '{username}' не найден")
@@ -107,14 +101,18 @@ class TradingPlatformService:
         portfolio = self._load_portfolio(user)
         wallets = portfolio.wallets
         if not wallets:
+            # _load_portfolio() may have just staged a new empty portfolio.
+            self._db.flush()
             return f"Портфель пользователя '{user.username}' пуст"
 
         lines = [f"Портфель пользователя '{user.username}' (база: {base_currency}):"]
         total = 0.0
 
-        for code in sorted(wallets.keys()):
+        codes = sorted(wallets.keys())
+        rates = self._resolve_rates_batch(codes, base_currency)
+        for code in codes:
             wallet = wallets[code]
-            rate, _updated_at = self._resolve_rate(code, base_currency)
+            rate, _updated_at = rates[code]
             converted = wallet.balance * rate
             total += converted
             lines.append(
@@ -124,6 +122,7 @@ class TradingPlatformService:
 
         lines.append("---------------------------------")
         lines.append(f"ИТОГО: {total:,.2f} {base_currency}")
+        self._db.flush()
         return "\n".join(lines)
 
     @log_action("BUY", verbose=True)
@@ -151,6 +150,7 @@ class TradingPlatformService:
         wallet.deposit(amount)
 
         self._save_portfolio(portfolio)
+        self._db.flush()
         self._action_context = {
             "currency_code": currency_obj.code,
             "amount": amount,
@@ -198,6 +198,7 @@ class TradingPlatformService:
         usd_wallet.deposit(proceeds)
 
         self._save_portfolio(portfolio)
+        self._db.flush()
         self._action_context = {
             "currency_code": currency_obj.code,
             "amount": amount,
@@ -223,6 +224,7 @@ class TradingPlatformService:
         to_currency = get_currency(to_code)
 
         rate, updated_at = self._resolve_rate(from_currency.code, to_currency.code)
+        self._db.flush()
         reverse = 0.0 if rate == 0 else 1.0 / rate
 
         return (
@@ -237,58 +239,74 @@ class TradingPlatformService:
         return self._current_user
 
     def _load_portfolio(self, user: User) -> Portfolio:
-        portfolios = self._db.get_portfolios()
-        payload = next(
-            (item for item in portfolios if int(item["user_id"]) == user.user_id),
-            None,
-        )
-
+        payload = self._db.get_portfolio_by_uid(user.user_id)
         if payload is None:
             portfolio = Portfolio(user_id=user.user_id, user=user)
-            portfolios.append(portfolio.to_dict())
-            self._db.save_portfolios(portfolios)
+            self._db.upsert_portfolio(portfolio.to_dict())
             return portfolio
 
         return Portfolio.from_dict(payload, user=user)
 
     def _save_portfolio(self, portfolio: Portfolio) -> None:
-        portfolios = self._db.get_portfolios()
-        replaced = False
-
-        for idx, item in enumerate(portfolios):
-            if int(item["user_id"]) == portfolio.user_id:
-                portfolios[idx] = portfolio.to_dict()
-                replaced = True
-                break
-
-        if not replaced:
-            portfolios.append(portfolio.to_dict())
-
-        self._db.save_portfolios(portfolios)
+        self._db.upsert_portfolio(portfolio.to_dict())
 
     def _resolve_rate(self, from_code: str, to_code: str) -> tuple[float, str]:
         from_code = normalize_currency_code(from_code)
-        to_code = normalize_currency_code(to_code)
-
-        ttl_seconds = int(self._settings.get("RATES_TTL_SECONDS", 300))
-        rates_payload = self._db.get_rates()
-
-        cached = resolve_rate_from_cache(rates_payload, from_code, to_code, ttl_seconds)
-        if cached is not None:
-            return cached
-
-        try:
-            fresh_rate = resolve_rate_from_stub(from_code, to_code)
-        except ApiRequestError:
-            raise
-        except Exception as exc:
-            raise ApiRequestError(str(exc)) from exc
-
-        updated_rates, updated_at = upsert_rate(
-            rates_payload,
-            from_code,
-            to_code,
-            fresh_rate,
-        )
-        self._db.save_rates(updated_rates)
-        return fresh_rate, updated_at
+        if from_code == normalize_currency_code(to_code):
+            return 1.0, datetime.now().isoformat(timespec="seconds")
+        return self._resolve_rates_batch((from_code,), to_code)[from_code]
+
+    def _resolve_rates_batch(
+        self, codes: Iterable[str], base_code: str
+    ) -> dict[str, tuple[float, str]]:
+        """Resolve CODE->BASE rates against one snapshot of the rates file."""
+        base_code = normalize_currency_code(base_code)
+        rates_payload: dict[str, Any] | None = None
+        ttl_seconds = self._rates_ttl_seconds
+        now = time.time()
+
+        resolved: dict[str, tuple[float, str]] = {}
+        missed = False
+        for code in codes:
+            code = normalize_currency_code(code)
+            if code == base_code:
+                # Identity pair: no need to touch the rates file at all.
+                resolved[code] = (
+                    1.0,
+                    datetime.fromtimestamp(now).isoformat(timespec="seconds"),
+                )
+                continue
+            if rates_payload is None:
+                rates_payload = self._db.get_rates()
+            cached = resolve_rate_from_cache(
+                rates_payload, code, base_code, ttl_seconds, now
+            )
+            if cached is None:
+                try:
+                    fresh_rate = resolve_rate_from_stub(code, base_code)
+                except ApiRequestError:
+                    raise
+                except Exception as exc:
+                    raise ApiRequestError(str(exc)) from exc
+
+                if not missed:
+                    # get_rates() hands out the cached dict itself; copy it
+                    # (and its pairs) once so a failed batch leaves it intact.
+                    rates_payload = dict(rates_payload)
+                    pairs = rates_payload.get("pairs")
+                    if isinstance(pairs, dict):
+                        rates_payload["pairs"] = dict(pairs)
+                rates_payload, updated_at = upsert_rate(
+                    rates_payload,
+                    code,
+                    base_code,
+                    fresh_rate,
+                    now=now,
+                )
+                cached = (fresh_rate, updated_at)
+                missed = True
+            resolved[code] = cached
+
+        if missed and rates_payload is not None:
+            self._db.save_rates(rates_payload)
+        return resolved
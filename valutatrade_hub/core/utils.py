@@ -3,21 +3,50 @@ from __future__ import annotations
 import hashlib
 import re
 import secrets
+import sys
+import time
 from datetime import datetime, timedelta
-from typing import Any
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Mapping
 
 from valutatrade_hub.core.exceptions import ApiRequestError
 
 _CURRENCY_CODE_PATTERN = re.compile(r"^[A-Z0-9]{2,5}$")
 
+# Local fallback rates against USD, used when the cache has no fresh pair.
+_USD_RATES: Mapping[str, float] = MappingProxyType(
+    {
+        "USD": 1.0,
+        "EUR": 1.0786,
+        "BTC": 59337.21,
+        "RUB": 0.01016,
+        "ETH": 3720.0,
+    }
+)
+
 
 def normalize_currency_code(currency_code: str) -> str:
+    # Type check stays outside the cache: unhashable input must raise
+    # ValueError rather than lru_cache's TypeError.
     if not isinstance(currency_code, str):
         raise ValueError("Код валюты должен быть строкой")
+    return _normalize_cached(currency_code)
+
+
+@lru_cache(maxsize=256)
+def _normalize_cached(currency_code: str) -> str:
     normalized = currency_code.strip().upper()
     if not _CURRENCY_CODE_PATTERN.match(normalized):
         raise ValueError("Код валюты должен быть в формате 2-5 символов A-Z0-9")
-    return normalized
+    # Interned codes make dict lookups by currency code an identity check.
+    return sys.intern(normalized)
+
+
+@lru_cache(maxsize=256)
+def pair_keys(from_code: str, to_code: str) -> tuple[str, str]:
+    """Return cached ``(FROM_TO, TO_FROM)`` rate keys for a currency pair."""
+    return f"{from_code}_{to_code}", f"{to_code}_{from_code}"
 
 
 def validate_amount(amount: Any) -> float:
@@ -31,9 +60,15 @@ def validate_amount(amount: Any) -> float:
     return numeric
 
 
+def password_digest(password: str, salt_bytes: bytes) -> bytes:
+    """SHA-256 of ``password + salt`` fed incrementally, without concatenating."""
+    digest = hashlib.sha256(password.encode("utf-8"))
+    digest.update(salt_bytes)
+    return digest.digest()
+
+
 def hash_password(password: str, salt: str) -> str:
-    payload = f"{password}{salt}".encode("utf-8")
-    return hashlib.sha256(payload).hexdigest()
+    return password_digest(password, salt.encode("utf-8")).hex()
 
 
 def generate_salt() -> str:
@@ -54,35 +89,43 @@ def is_rate_fresh(updated_at: str, ttl_seconds: int) -> bool:
     return now - updated <= timedelta(seconds=ttl_seconds)
 
 
+def _is_entry_fresh(entry: dict[str, Any], ttl_seconds: int, now: float) -> bool:
+    # Rows written by upsert_rate carry a numeric epoch; older rows only
+    # have the ISO string and need the slower parse.
+    epoch = entry.get("updated_at_epoch")
+    if type(epoch) in (int, float):
+        return now - epoch <= ttl_seconds
+    return is_rate_fresh(str(entry.get("updated_at", "")), ttl_seconds)
+
+
 def resolve_rate_from_cache(
     rates_payload: dict[str, Any],
     from_code: str,
     to_code: str,
     ttl_seconds: int,
+    now: float | None = None,
 ) -> tuple[float, str] | None:
     pairs = rates_payload.get("pairs", rates_payload)
     if not isinstance(pairs, dict):
         return None
 
+    if now is None:
+        now = time.time()
     if from_code == to_code:
-        now = datetime.now().isoformat(timespec="seconds")
-        return 1.0, now
+        return 1.0, datetime.fromtimestamp(now).isoformat(timespec="seconds")
 
-    pair = f"{from_code}_{to_code}"
-    reverse_pair = f"{to_code}_{from_code}"
+    pair, reverse_pair = pair_keys(from_code, to_code)
 
     direct_entry = pairs.get(pair)
     if isinstance(direct_entry, dict):
-        updated_at = str(direct_entry.get("updated_at", ""))
-        if is_rate_fresh(updated_at, ttl_seconds):
-            return float(direct_entry["rate"]), updated_at
+        if _is_entry_fresh(direct_entry, ttl_seconds, now):
+            return float(direct_entry["rate"]), str(direct_entry.get("updated_at", ""))
 
     reverse_entry = pairs.get(reverse_pair)
     if isinstance(reverse_entry, dict):
-        updated_at = str(reverse_entry.get("updated_at", ""))
         reverse_rate = float(reverse_entry.get("rate", 0.0))
-        if reverse_rate > 0 and is_rate_fresh(updated_at, ttl_seconds):
-            return 1.0 / reverse_rate, updated_at
+        if reverse_rate > 0 and _is_entry_fresh(reverse_entry, ttl_seconds, now):
+            return 1.0 / reverse_rate, str(reverse_entry.get("updated_at", ""))
 
     return None
 
@@ -91,20 +134,11 @@ def resolve_rate_from_stub(from_code: str, to_code: str) -> float:
     if from_code == to_code:
         return 1.0
 
-    usd_rates = {
-        "USD": 1.0,
-        "EUR": 1.0786,
-        "BTC": 59337.21,
-        "RUB": 0.01016,
-        "ETH": 3720.0,
-    }
-
-    if from_code not in usd_rates or to_code not in usd_rates:
-        raise ApiRequestError(f"курс {from_code}->{to_code} не найден")
-
     # Convert via USD bridge.
-    from_to_usd = usd_rates[from_code]
-    to_to_usd = usd_rates[to_code]
+    from_to_usd = _USD_RATES.get(from_code)
+    to_to_usd = _USD_RATES.get(to_code)
+    if from_to_usd is None or to_to_usd is None:
+        raise ApiRequestError(f"курс {from_code}->{to_code} не найден")
     return from_to_usd / to_to_usd
 
 
@@ -114,8 +148,10 @@ def upsert_rate(
     to_code: str,
     rate: float,
     source: str = "LocalStub",
+    now: float | None = None,
 ) -> tuple[dict[str, Any], str]:
-    now = datetime.now().isoformat(timespec="seconds")
+    epoch = time.time() if now is None else now
+    updated_at = datetime.fromtimestamp(epoch).isoformat(timespec="seconds")
     key = f"{from_code}_{to_code}"
     pairs = rates_payload.get("pairs")
     if not isinstance(pairs, dict):
@@ -123,9 +159,10 @@ def upsert_rate(
 
     pairs[key] = {
         "rate": rate,
-        "updated_at": now,
+        "updated_at": updated_at,
+        "updated_at_epoch": epoch,
         "source": source,
     }
     rates_payload["pairs"] = pairs
-    rates_payload["last_refresh"] = now
-    return rates_payload, now
+    rates_payload["last_refresh"] = updated_at
+    return rates_payload, updated_at
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import inspect
 import logging
+import time
 from datetime import datetime
 from functools import wraps
 from typing import Any, Callable
@@ -11,53 +12,75 @@ logger = logging.getLogger("valutatrade.actions")
 
 def log_action(action: str, verbose: bool = False) -> Callable:
     def decorator(func: Callable) -> Callable:
-        signature = inspect.signature(func)
+        # Resolve argument positions once instead of binding on every call.
+        positions = {
+            name: index
+            for index, name in enumerate(inspect.getfullargspec(func).args)
+        }
+        defaults = {
+            name: parameter.default
+            for name, parameter in inspect.signature(func).parameters.items()
+            if parameter.default is not inspect.Parameter.empty
+        }
+
+        def argument(name: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+            if name in kwargs:
+                return kwargs[name]
+            index = positions.get(name)
+            if index is not None and index < len(args):
+                return args[index]
+            return defaults.get(name, "-")
+
+        def _build_payload(
+            service: Any,
+            user: Any,
+            started: float,
+            args: tuple[Any, ...],
+            kwargs: dict[str, Any],
+        ) -> dict[str, Any]:
+            payload = {
+                "timestamp": datetime.fromtimestamp(started).isoformat(
+                    timespec="seconds"
+                ),
+                "action": action,
+                "username": getattr(user, "username", "-") if user else "-",
+                "user_id": getattr(user, "user_id", "-") if user else "-",
+                "currency_code": argument("currency", args, kwargs),
+                "amount": argument("amount", args, kwargs),
+                "rate": "-",
+                "base": "-",
+            }
+            if service is not None:
+                payload.update(getattr(service, "_action_context", {}))
+            return payload
 
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            bound = signature.bind_partial(*args, **kwargs)
-            bound.apply_defaults()
-
-            service = bound.arguments.get("self")
+            service = args[0] if args and positions.get("self") == 0 else None
             if service is not None:
                 setattr(service, "_action_context", {})
-
+            # Caller identity as it was before the action (login changes it).
             user = getattr(service, "current_user", None) if service else None
-            username = getattr(user, "username", "-") if user else "-"
-            user_id = getattr(user, "user_id", "-") if user else "-"
-
-            timestamp = datetime.now().isoformat(timespec="seconds")
-            payload = {
-                "timestamp": timestamp,
-                "action": action,
-                "username": username,
-                "user_id": user_id,
-                "currency_code": bound.arguments.get("currency", "-"),
-                "amount": bound.arguments.get("amount", "-"),
-                "rate": "-",
-                "base": "-",
-            }
+            started = time.time()
 
             try:
                 result = func(*args, **kwargs)
-                context = getattr(service, "_action_context", {}) if service else {}
-                payload.update(context)
+            except Exception as exc:
+                if logger.isEnabledFor(logging.ERROR):
+                    payload = _build_payload(service, user, started, args, kwargs)
+                    payload["result"] = "ERROR"
+                    payload["error_type"] = exc.__class__.__name__
+                    payload["error_message"] = str(exc)
+                    logger.error("%s", _format_log_message(payload, verbose))
+                raise
+
+            if logger.isEnabledFor(logging.INFO):
+                payload = _build_payload(service, user, started, args, kwargs)
                 payload["result"] = "OK"
                 payload["error_type"] = "-"
                 payload["error_message"] = "-"
-
-                message = _format_log_message(payload, verbose)
-                logger.info(message)
-                return result
-            except Exception as exc:
-                context = getattr(service, "_action_context", {}) if service else {}
-                payload.update(context)
-                payload["result"] = "ERROR"
-                payload["error_type"] = exc.__class__.__name__
-                payload["error_message"] = str(exc)
-                message = _format_log_message(payload, verbose)
-                logger.error(message)
-                raise
+                logger.info("%s", _format_log_message(payload, verbose))
+            return result
 
         return wrapper
 
@@ -66,10 +89,10 @@ def log_action(action: str, verbose: bool = False) -> Callable:
 
 def _format_log_message(payload: dict[str, Any], verbose: bool) -> str:
     amount = payload.get("amount")
-    amount_repr = f"{float(amount):.4f}" if isinstance(amount, (int, float)) else amount
+    amount_repr = f"{amount:.4f}" if type(amount) in (int, float) else amount
 
     rate = payload.get("rate")
-    rate_repr = f"{float(rate):.8f}" if isinstance(rate, (int, float)) else rate
+    rate_repr = f"{rate:.8f}" if type(rate) in (int, float) else rate
 
     message = (
         f"{payload.get('timestamp')} "
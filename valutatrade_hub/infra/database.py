@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-import json
+import atexit
+import os
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+
+import orjson
 
 from valutatrade_hub.infra.settings import SettingsLoader
 
@@ -20,7 +23,20 @@ class DatabaseManager:
         if self._initialized:
             return
         self._settings = SettingsLoader()
+        # Parsed file contents keyed by path, validated against st_mtime_ns.
+        self._cache: dict[Path, tuple[int, Any]] = {}
+        # Paths whose cached payload is newer than the file; see flush().
+        self._dirty: set[Path] = set()
+        # Bumped whenever a path's cached payload is replaced or restaged;
+        # lookup indexes built over a payload are tagged with this version.
+        self._versions: dict[Path, int] = {}
+        self._indexes: dict[Path, tuple[int, Any]] = {}
+        self._dump_options = orjson.OPT_NON_STR_KEYS
+        if self._settings.get("DB_PRETTY_JSON", False):
+            self._dump_options |= orjson.OPT_INDENT_2
+        self._fsync_on_flush = bool(self._settings.get("DB_FSYNC_ON_FLUSH", False))
         self._ensure_storage()
+        atexit.register(self.flush)
         self._initialized = True
 
     def _ensure_storage(self) -> None:
@@ -38,15 +54,91 @@ class DatabaseManager:
                 self._write_json(path, payload)
 
     def _read_json(self, path: Path, default: Any) -> Any:
+        if path in self._dirty:
+            return self._cache[path][1]
+
         try:
-            with path.open("r", encoding="utf-8") as file:
-                return json.load(file)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return default
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return self._fallback(path, default)
 
-    def _write_json(self, path: Path, payload: Any) -> None:
-        with path.open("w", encoding="utf-8") as file:
-            json.dump(payload, file, ensure_ascii=False, indent=2)
+        cached = self._cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            payload = orjson.loads(path.read_bytes())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return self._fallback(path, default)
+
+        self._cache[path] = (mtime, payload)
+        self._bump_version(path)
+        return payload
+
+    def _fallback(self, path: Path, default: Any) -> Any:
+        # The file is gone or unreadable: forget the old payload so indexes
+        # built over it are rebuilt against the default.
+        if self._cache.pop(path, None) is not None:
+            self._bump_version(path)
+        return default
+
+    def _write_json(self, path: Path, payload: Any, sync: bool = False) -> None:
+        # Write a sibling and swap it in, so a crash never leaves a torn file.
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with tmp_path.open("wb") as file:
+            file.write(orjson.dumps(payload, option=self._dump_options))
+            if sync:
+                file.flush()
+                os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+        self._cache[path] = (path.stat().st_mtime_ns, payload)
+
+    def _stage(self, path: Path, payload: Any) -> None:
+        self._cache[path] = (0, payload)
+        self._dirty.add(path)
+        self._bump_version(path)
+
+    def _bump_version(self, path: Path) -> None:
+        self._versions[path] = self._versions.get(path, 0) + 1
+
+    def _index(self, path: Path, build: Callable[[Any], Any]) -> Any:
+        payload = self._read_json(path, default=[])
+        version = self._versions.get(path, 0)
+        cached = self._indexes.get(path)
+        if cached is None or cached[0] != version:
+            cached = (version, build(payload))
+            self._indexes[path] = cached
+        return cached[1]
+
+    def _keep_index(self, path: Path, index: Any) -> None:
+        """Mark an index updated in place as matching the current payload."""
+        self._indexes[path] = (self._versions.get(path, 0), index)
+
+    def _users_index(self) -> tuple[dict[str, dict[str, Any]], int]:
+        def build(users: list[dict[str, Any]]) -> tuple[dict[str, Any], int]:
+            by_name: dict[str, dict[str, Any]] = {}
+            max_user_id = 0
+            for item in users:
+                by_name.setdefault(item["username"], item)
+                max_user_id = max(max_user_id, int(item["user_id"]))
+            return by_name, max_user_id
+
+        return self._index(self._settings.resolve_path("USERS_FILE"), build)
+
+    def _portfolios_index(self) -> dict[int, int]:
+        def build(portfolios: list[dict[str, Any]]) -> dict[int, int]:
+            positions: dict[int, int] = {}
+            for position, item in enumerate(portfolios):
+                positions.setdefault(int(item["user_id"]), position)
+            return positions
+
+        return self._index(self._settings.resolve_path("PORTFOLIOS_FILE"), build)
+
+    def flush(self) -> None:
+        """Write every file saved since the last flush, once each."""
+        while self._dirty:
+            path = self._dirty.pop()
+            self._write_json(path, self._cache[path][1], sync=self._fsync_on_flush)
 
     def get_users(self) -> list[dict[str, Any]]:
         path = self._settings.resolve_path("USERS_FILE")
@@ -54,7 +146,23 @@ class DatabaseManager:
 
     def save_users(self, users: list[dict[str, Any]]) -> None:
         path = self._settings.resolve_path("USERS_FILE")
-        self._write_json(path, users)
+        self._stage(path, users)
+
+    def get_users_by_name(self) -> dict[str, dict[str, Any]]:
+        return self._users_index()[0]
+
+    def get_max_user_id(self) -> int:
+        return self._users_index()[1]
+
+    def add_user(self, user: dict[str, Any]) -> None:
+        path = self._settings.resolve_path("USERS_FILE")
+        users = self.get_users()
+        by_name, max_user_id = self._users_index()
+
+        users.append(user)
+        self._stage(path, users)
+        by_name[user["username"]] = user
+        self._keep_index(path, (by_name, max(max_user_id, int(user["user_id"]))))
 
     def get_portfolios(self) -> list[dict[str, Any]]:
         path = self._settings.resolve_path("PORTFOLIOS_FILE")
@@ -62,7 +170,31 @@ class DatabaseManager:
 
     def save_portfolios(self, portfolios: list[dict[str, Any]]) -> None:
         path = self._settings.resolve_path("PORTFOLIOS_FILE")
-        self._write_json(path, portfolios)
+        self._stage(path, portfolios)
+
+    def get_portfolio_by_uid(self, user_id: int) -> dict[str, Any] | None:
+        position = self._portfolios_index().get(user_id)
+        if position is None:
+            return None
+        portfolios = self.get_portfolios()
+        if position >= len(portfolios):
+            return None
+        return portfolios[position]
+
+    def upsert_portfolio(self, portfolio: dict[str, Any]) -> None:
+        path = self._settings.resolve_path("PORTFOLIOS_FILE")
+        portfolios = self.get_portfolios()
+        positions = self._portfolios_index()
+
+        user_id = int(portfolio["user_id"])
+        position = positions.get(user_id)
+        if position is None:
+            positions[user_id] = len(portfolios)
+            portfolios.append(portfolio)
+        else:
+            portfolios[position] = portfolio
+        self._stage(path, portfolios)
+        self._keep_index(path, positions)
 
     def get_rates(self) -> dict[str, Any]:
         path = self._settings.resolve_path("RATES_FILE")
@@ -70,4 +202,4 @@ class DatabaseManager:
 
     def save_rates(self, rates: dict[str, Any]) -> None:
         path = self._settings.resolve_path("RATES_FILE")
-        self._write_json(path, rates)
+        self._stage(path, rates)
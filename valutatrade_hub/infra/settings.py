@@ -21,17 +21,33 @@ class SettingsLoader:
             return
         self._base_dir = Path(__file__).resolve().parents[2]
         self._config: dict[str, Any] = {}
+        self._resolved_paths: dict[str, Path] = {}
+        # st_mtime_ns of pyproject.toml behind _config (0 if it is missing).
+        self._config_mtime: int | None = None
+        self._generation = 0
         self.reload()
         self._initialized = True
 
     def reload(self) -> None:
+        config_path = self._base_dir / "pyproject.toml"
+        try:
+            mtime = config_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = 0
+        if self._config and mtime == self._config_mtime:
+            return
+
         defaults = {
             "DATA_DIR": "data",
             "USERS_FILE": "data/users.json",
             "PORTFOLIOS_FILE": "data/portfolios.json",
             "RATES_FILE": "data/rates.json",
-            "EXCHANGE_HISTORY_FILE": "data/exchange_rates.json",
+            "EXCHANGE_HISTORY_FILE": "data/exchange_rates.jsonl",
+            "HISTORY_MAX_RECORDS": 10_000,
+            "HISTORY_MAX_AGE_DAYS": 30,
             "RATES_TTL_SECONDS": 300,
+            "DB_PRETTY_JSON": False,
+            "DB_FSYNC_ON_FLUSH": False,
             "DEFAULT_BASE_CURRENCY": "USD",
             "LOG_FILE": "logs/actions.log",
             "PARSER_LOG_FILE": "logs/parser.log",
@@ -42,10 +58,9 @@ class SettingsLoader:
             "REQUEST_TIMEOUT": 10,
         }
 
-        config_path = self._base_dir / "pyproject.toml"
         tool_config: dict[str, Any] = {}
 
-        if config_path.exists():
+        if mtime:
             with config_path.open("rb") as file:
                 parsed = tomllib.load(file)
             tool_config = parsed.get("tool", {}).get("valutatrade", {})
@@ -53,14 +68,32 @@ class SettingsLoader:
         merged = defaults.copy()
         merged.update(tool_config)
         self._config = merged
+        self._config_mtime = mtime
+        self._generation += 1
+        self._resolved_paths = {
+            key: self._to_path(value)
+            for key, value in merged.items()
+            if isinstance(value, str) and ("FILE" in key or "DIR" in key)
+        }
+
+    @property
+    def generation(self) -> int:
+        """Incremented whenever reload() actually replaces the config."""
+        return self._generation
 
     def get(self, key: str, default: Any = None) -> Any:
         return self._config.get(key, default)
 
     def resolve_path(self, key: str) -> Path:
+        path = self._resolved_paths.get(key)
+        if path is not None:
+            return path
         value = self.get(key)
         if value is None:
             raise KeyError(f"Unknown settings key: {key}")
+        return self._to_path(value)
+
+    def _to_path(self, value: Any) -> Path:
         path = Path(str(value))
         if not path.is_absolute():
             path = self._base_dir / path
@@ -7,14 +7,14 @@ from valutatrade_hub.infra.settings import SettingsLoader
 
 
 def setup_logging() -> None:
-    settings = SettingsLoader()
-    log_file = settings.resolve_path("LOG_FILE")
-    log_file.parent.mkdir(parents=True, exist_ok=True)
-
     logger = logging.getLogger("valutatrade.actions")
     if logger.handlers:
         return
 
+    settings = SettingsLoader()
+    log_file = settings.resolve_path("LOG_FILE")
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+
     level_name = str(settings.get("LOG_LEVEL", "INFO")).upper()
     level = getattr(logging, level_name, logging.INFO)
     logger.setLevel(level)
@@ -37,14 +37,14 @@ def setup_logging() -> None:
 
 
 def setup_parser_logging() -> logging.Logger:
-    settings = SettingsLoader()
-    log_file = settings.resolve_path("PARSER_LOG_FILE")
-    log_file.parent.mkdir(parents=True, exist_ok=True)
-
     logger = logging.getLogger("valutatrade.parser")
     if logger.handlers:
         return logger
 
+    settings = SettingsLoader()
+    log_file = settings.resolve_path("PARSER_LOG_FILE")
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+
     level_name = str(settings.get("LOG_LEVEL", "INFO")).upper()
     level = getattr(logging, level_name, logging.INFO)
     logger.setLevel(level)
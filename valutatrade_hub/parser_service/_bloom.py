@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import hashlib
+import math
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings (double hashing on blake2b)."""
+
+    __slots__ = ("_bits", "_size", "_hashes", "_capacity", "_count")
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        capacity = max(1, capacity)
+        size = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self._size = max(8, size)
+        self._hashes = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+        self._capacity = capacity
+        self._count = 0
+
+    @property
+    def is_full(self) -> bool:
+        return self._count >= self._capacity
+
+    def _positions(self, item: str) -> list[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * step) % self._size for i in range(self._hashes)]
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self._count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(
+            bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class ScalableBloomFilter:
+    """Bloom filter that adds larger, stricter stages as it fills up.
+
+    Stage error rates halve, so the overall false-positive rate stays below
+    ``error_rate`` however many items are added.
+    """
+
+    __slots__ = ("_filters", "_next_capacity", "_next_error_rate")
+
+    def __init__(self, initial_capacity: int = 10_000, error_rate: float = 0.001):
+        self._filters: list[BloomFilter] = []
+        self._next_capacity = initial_capacity
+        self._next_error_rate = error_rate / 2
+
+    def add(self, item: str) -> None:
+        if not self._filters or self._filters[-1].is_full:
+            self._filters.append(
+                BloomFilter(self._next_capacity, self._next_error_rate)
+            )
+            self._next_capacity *= 2
+            self._next_error_rate /= 2
+        self._filters[-1].add(item)
+
+    def __contains__(self, item: str) -> bool:
+        return any(item in stage for stage in self._filters)
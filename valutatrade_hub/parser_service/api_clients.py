@@ -6,16 +6,92 @@ from datetime import datetime, timezone
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from valutatrade_hub.core.exceptions import ApiRequestError
 from valutatrade_hub.parser_service.config import ParserConfig
 
 
 class BaseApiClient(ABC):
+    """Rates provider holding one pooled HTTP session for its whole lifetime.
+
+    The session is reused across scheduler cycles; call close() to release it.
+    """
+
     def __init__(self, config: ParserConfig) -> None:
         self.config = config
         self.last_fetch_meta: dict[str, dict[str, Any]] = {}
         self.last_updated_at = datetime.now(timezone.utc).isoformat()
+        # Reused across fetches so keep-alive connections survive between calls.
+        self._session = self._build_session()
+        # Validator of the last 200 response; a 304 reuses ``_last_rates``.
+        self._etag = ""
+        self._last_rates: dict[str, float] = {}
+
+    def close(self) -> None:
+        self._session.close()
+
+    @staticmethod
+    def _build_session() -> requests.Session:
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.3,
+                status_forcelist=(500, 502, 503, 504),
+            ),
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _get(
+        self,
+        url: str,
+        params: dict[str, str] | None = None,
+    ) -> requests.Response | None:
+        """GET with If-None-Match; returns None when the server answers 304."""
+        headers = {}
+        if self._etag and self._last_rates:
+            headers["If-None-Match"] = self._etag
+        try:
+            response = self._session.get(
+                url,
+                params=params,
+                headers=headers,
+                timeout=self.config.request_timeout,
+            )
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+        except requests.exceptions.RequestException as exc:
+            raise ApiRequestError(f"{self.source_name}: {exc}") from exc
+        return response
+
+    def _remember(
+        self,
+        response: requests.Response,
+        rates: dict[str, float],
+        meta: dict[str, dict[str, Any]],
+        updated_at: str,
+    ) -> dict[str, float]:
+        self._etag = response.headers.get("ETag", "")
+        self._last_rates = rates
+        self.last_fetch_meta = meta
+        self.last_updated_at = updated_at
+        return dict(rates)
+
+    def _not_modified(self, duration_ms: int) -> dict[str, float]:
+        # Fresh dicts: the previous ones may already back history records.
+        self.last_fetch_meta = {
+            pair: {**item, "request_ms": duration_ms, "status_code": 304}
+            for pair, item in self.last_fetch_meta.items()
+        }
+        self.last_updated_at = datetime.now(timezone.utc).isoformat()
+        return dict(self._last_rates)
 
     @property
     @abstractmethod
@@ -43,29 +119,24 @@ class CoinGeckoClient(BaseApiClient):
         }
 
         start = time.perf_counter()
-        try:
-            response = requests.get(
-                self.config.coingecko_url,
-                params=params,
-                timeout=self.config.request_timeout,
-            )
-            response.raise_for_status()
-        except requests.exceptions.RequestException as exc:
-            raise ApiRequestError(f"CoinGecko: {exc}") from exc
-
+        response = self._get(self.config.coingecko_url, params=params)
         duration_ms = int((time.perf_counter() - start) * 1000)
+        if response is None:
+            return self._not_modified(duration_ms)
+
         payload = response.json()
         updated_at = datetime.now(timezone.utc).isoformat()
 
         rates: dict[str, float] = {}
         meta: dict[str, dict[str, Any]] = {}
 
-        for code in self.config.crypto_currencies:
-            raw_id = self.config.crypto_id_map[code]
-            raw_item = payload.get(raw_id)
-            if not isinstance(raw_item, dict):
+        base_key = self.config.base_currency.lower()
+        crypto_id_reverse = self.config.crypto_id_reverse
+        for raw_id, raw_item in payload.items():
+            code = crypto_id_reverse.get(raw_id)
+            if code is None or not isinstance(raw_item, dict):
                 continue
-            raw_rate = raw_item.get(self.config.base_currency.lower())
+            raw_rate = raw_item.get(base_key)
             if not isinstance(raw_rate, (int, float)):
                 continue
 
@@ -78,9 +149,7 @@ class CoinGeckoClient(BaseApiClient):
                 "etag": response.headers.get("ETag", ""),
             }
 
-        self.last_fetch_meta = meta
-        self.last_updated_at = updated_at
-        return rates
+        return self._remember(response, rates, meta, updated_at)
 
 
 class ExchangeRateApiClient(BaseApiClient):
@@ -99,13 +168,11 @@ class ExchangeRateApiClient(BaseApiClient):
         )
 
         start = time.perf_counter()
-        try:
-            response = requests.get(url, timeout=self.config.request_timeout)
-            response.raise_for_status()
-        except requests.exceptions.RequestException as exc:
-            raise ApiRequestError(f"ExchangeRate-API: {exc}") from exc
-
+        response = self._get(url)
         duration_ms = int((time.perf_counter() - start) * 1000)
+        if response is None:
+            return self._not_modified(duration_ms)
+
         payload = response.json()
 
         if payload.get("result") != "success":
@@ -138,6 +205,4 @@ class ExchangeRateApiClient(BaseApiClient):
                 "etag": response.headers.get("ETag", ""),
             }
 
-        self.last_fetch_meta = meta
-        self.last_updated_at = updated_at
-        return rates
+        return self._remember(response, rates, meta, updated_at)
@@ -2,7 +2,10 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping
 
 from valutatrade_hub.infra.settings import SettingsLoader
 
@@ -18,7 +21,7 @@ class ParserConfig:
     base_currency: str = "USD"
     fiat_currencies: tuple[str, ...] = ("EUR", "GBP", "RUB")
     crypto_currencies: tuple[str, ...] = ("BTC", "ETH", "SOL")
-    crypto_id_map: dict[str, str] = field(
+    crypto_id_map: Mapping[str, str] = field(
         default_factory=lambda: {
             "BTC": "bitcoin",
             "ETH": "ethereum",
@@ -28,15 +31,50 @@ class ParserConfig:
 
     request_timeout: int = 10
     rates_file_path: Path = Path("data/rates.json")
-    history_file_path: Path = Path("data/exchange_rates.json")
+    history_file_path: Path = Path("data/exchange_rates.jsonl")
+    pretty_json: bool = False
+    # History retention, enforced when the file compacts; 0 disables a limit.
+    history_retention_max_records: int = 10_000
+    history_retention_max_age_days: int = 30
+    # CoinGecko id -> code, built once; both maps are read-only views.
+    crypto_id_reverse: Mapping[str, str] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.crypto_id_map = MappingProxyType(dict(self.crypto_id_map))
+        self.crypto_id_reverse = MappingProxyType(
+            {raw_id: code for code, raw_id in self.crypto_id_map.items()}
+        )
 
     @classmethod
     def from_settings(cls) -> "ParserConfig":
+        # Built once per (API key, settings generation) and shared by the
+        # storage, clients and updater wired from it.
         settings = SettingsLoader()
-        return cls(
-            exchangerate_api_key=os.getenv("EXCHANGERATE_API_KEY", ""),
-            base_currency=str(settings.get("DEFAULT_BASE_CURRENCY", "USD")),
-            request_timeout=int(settings.get("REQUEST_TIMEOUT", 10)),
-            rates_file_path=settings.resolve_path("RATES_FILE"),
-            history_file_path=settings.resolve_path("EXCHANGE_HISTORY_FILE"),
+        return _config_from_settings(
+            cls,
+            os.getenv("EXCHANGERATE_API_KEY", ""),
+            settings.generation,
         )
+
+
+@lru_cache(maxsize=4)
+def _config_from_settings(
+    cls: type[ParserConfig],
+    api_key: str,
+    _generation: int,
+) -> ParserConfig:
+    settings = SettingsLoader()
+    return cls(
+        exchangerate_api_key=api_key,
+        base_currency=str(settings.get("DEFAULT_BASE_CURRENCY", "USD")),
+        request_timeout=int(settings.get("REQUEST_TIMEOUT", 10)),
+        rates_file_path=settings.resolve_path("RATES_FILE"),
+        history_file_path=settings.resolve_path("EXCHANGE_HISTORY_FILE"),
+        pretty_json=bool(settings.get("DB_PRETTY_JSON", False)),
+        history_retention_max_records=int(
+            settings.get("HISTORY_MAX_RECORDS", 10_000)
+        ),
+        history_retention_max_age_days=int(
+            settings.get("HISTORY_MAX_AGE_DAYS", 30)
+        ),
+    )
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(slots=True)
+class PairEntry:
+    """One pair in the rates cache, as produced by an update cycle."""
+
+    rate: float
+    updated_at: str
+    source: str
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "updated_at": self.updated_at,
+            "source": self.source,
+        }
+
+
+@dataclass(slots=True)
+class HistoryRecord:
+    """One line of the JSON Lines history; field order is the key order."""
+
+    id: str
+    from_currency: str
+    to_currency: str
+    rate: float
+    timestamp: str
+    source: str
+    meta: dict[str, Any]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import math
 import threading
 import time
 
@@ -7,20 +8,46 @@ from valutatrade_hub.parser_service.updater import RatesUpdater
 
 
 class RatesScheduler:
-    def __init__(self, updater: RatesUpdater, interval_seconds: int = 300) -> None:
+    def __init__(
+        self,
+        updater: RatesUpdater,
+        interval_seconds: int = 300,
+        close_updater: bool = False,
+    ) -> None:
         self._updater = updater
+        # The caller owns the updater unless it hands it over explicitly.
+        self._close_updater = close_updater
         self._interval_seconds = interval_seconds
         self._stop_event = threading.Event()
 
     def run_forever(self) -> None:
-        while not self._stop_event.is_set():
-            self._updater.run_update()
-            self._stop_event.wait(self._interval_seconds)
+        # Cadence is measured from the previous deadline, not from the end of
+        # the update, so slow updates do not stretch the interval.
+        interval = self._interval_seconds
+        deadline = time.monotonic()
+        try:
+            while not self._stop_event.is_set():
+                deadline += interval
+                self._updater.run_update()
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    # Overran one or more slots: skip them instead of bursting.
+                    missed = math.ceil(-remaining / interval) if interval > 0 else 0
+                    deadline += interval * missed
+                    remaining = deadline - time.monotonic()
+                if self._stop_event.wait(max(0.0, remaining)):
+                    break
+            self._updater.flush()
+        finally:
+            # Also on errors from run_update(): stop the fetch pool, close
+            # sessions and drain queued writes of an updater handed over.
+            if self._close_updater:
+                self._updater.close()
 
     def stop(self) -> None:
         self._stop_event.set()
 
     def run_once_after_delay(self, delay_seconds: int) -> None:
-        time.sleep(delay_seconds)
-        if not self._stop_event.is_set():
+        if not self._stop_event.wait(delay_seconds):
             self._updater.run_update()
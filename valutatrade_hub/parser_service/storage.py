@@ -1,116 +1,557 @@
 from __future__ import annotations
 
-import json
-from datetime import datetime, timezone
+import atexit
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from tempfile import NamedTemporaryFile
-from typing import Any
+from typing import Any, Iterable, Iterator, Mapping
 
+import orjson
+
+from valutatrade_hub.parser_service._bloom import ScalableBloomFilter
 from valutatrade_hub.parser_service.config import ParserConfig
+from valutatrade_hub.parser_service.records import HistoryRecord, PairEntry
+
+_logger = logging.getLogger("valutatrade.parser")
+
+_UTC_SUFFIXES = frozenset(("Z", "+00:00"))
+# Exact ids kept for the newest records; older ones live only in the bloom.
+_RECENT_IDS_LIMIT = 4096
+# Expired history is pruned once the oldest record is this far past the
+# cutoff, so age-based compaction rewrites the file at most about hourly.
+_AGE_COMPACTION_SLACK = timedelta(hours=1)
 
 
 class ParserStorage:
     def __init__(self, config: ParserConfig) -> None:
         self._config = config
+        self._dump_options = orjson.OPT_APPEND_NEWLINE
+        if config.pretty_json:
+            self._dump_options |= orjson.OPT_INDENT_2
+        self._meta_file_path = config.rates_file_path.with_name(
+            f"{config.rates_file_path.stem}.meta.json"
+        )
+        # In-memory copy of the rates file, revalidated by st_mtime_ns so
+        # writes by other components (DatabaseManager) are picked up.
+        self._rates_cache: dict[str, Any] | None = None
+        self._rates_mtime = 0
+        self._rates_dirty = False
+        # Ids already in history, loaded once on first append: a bloom filter
+        # answers "definitely new"; a hit is confirmed against the recent-id
+        # LRU and then, rarely, by scanning the file.
+        self._history_bloom: ScalableBloomFilter | None = None
+        self._recent_ids: OrderedDict[str, None] = OrderedDict()
+        self._history_count = 0
+        # Oldest timestamp among tracked records, drives age-based compaction.
+        self._history_oldest: datetime | None = None
+        # blake2b digest and resulting st_mtime_ns of the last bytes written
+        # per path, used to skip rewriting identical content.
+        self._written: dict[Path, tuple[bytes, int]] = {}
+        # Parent directories already created, so writes skip mkdir.
+        self._ensured_dirs: set[Path] = set()
         self._ensure_files()
 
+        # Background writer: commit() queues bytes and returns; the writer
+        # thread persists them. Queued file contents are coalesced (only the
+        # newest bytes per path are kept), history lines accumulate.
+        self._cv = threading.Condition()
+        self._pending_history: list[bytes] = []
+        self._pending_files: dict[Path, bytes] = {}
+        self._pending_rates_seq = 0
+        self._rates_seq = 0
+        self._writing = False
+        self._closed = False
+        self._write_error: Exception | None = None
+        self._writer = threading.Thread(
+            target=self._writer_loop,
+            name="parser-storage-writer",
+            daemon=True,
+        )
+        self._writer.start()
+        atexit.register(self.close)
+
     def _ensure_files(self) -> None:
-        self._config.rates_file_path.parent.mkdir(parents=True, exist_ok=True)
-        self._config.history_file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._ensure_dir(self._config.rates_file_path.parent)
+        self._ensure_dir(self._config.history_file_path.parent)
 
         if not self._config.rates_file_path.exists():
             self.atomic_write_json(
                 self._config.rates_file_path,
                 {"pairs": {}, "last_refresh": None},
             )
-        if not self._config.history_file_path.exists():
-            self.atomic_write_json(self._config.history_file_path, [])
+        self._migrate_history()
+        self._config.history_file_path.touch(exist_ok=True)
+
+    def _ensure_dir(self, directory: Path) -> None:
+        if directory not in self._ensured_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._ensured_dirs.add(directory)
+
+    def _migrate_history(self) -> None:
+        """Convert a legacy JSON-array history file to JSON Lines, once."""
+        path = self._config.history_file_path
+        source = path
+        if not path.exists():
+            source = path.with_suffix(".json")
+            if source == path or not source.exists():
+                return
+        with source.open("rb") as file:
+            head = file.read(64).lstrip()
+        if not head.startswith(b"["):
+            return
+
+        records = self._read_json(source, [])
+        if not isinstance(records, list):
+            records = []
+        lines = b"".join(
+            orjson.dumps(record) + b"\n"
+            for record in records
+            if isinstance(record, dict)
+        )
+        self._atomic_write_bytes(path, lines)
+
+    def _compact_history(self) -> None:
+        """Rewrite history keeping only records inside the retention window."""
+        max_records = self._config.history_retention_max_records
+        max_age_days = self._config.history_retention_max_age_days
+        cutoff = (
+            datetime.now(timezone.utc) - timedelta(days=max_age_days)
+            if max_age_days > 0
+            else None
+        )
+
+        kept: deque[tuple[str, datetime, bytes]] = deque(
+            maxlen=max_records if max_records > 0 else None
+        )
+        with self._config.history_file_path.open("rb") as file:
+            for line in file:
+                try:
+                    record = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue
+                if not isinstance(record, dict):
+                    continue
+                timestamp = _parse_utc(record.get("timestamp"))
+                if cutoff is not None and timestamp < cutoff:
+                    continue
+                line = line.rstrip(b"\n") + b"\n"
+                kept.append((str(record.get("id")), timestamp, line))
+
+        self._atomic_write_bytes(
+            self._config.history_file_path,
+            b"".join(line for _record_id, _timestamp, line in kept),
+        )
+        with self._cv:
+            # Rebuild the bloom without the dropped records. Ids queued since
+            # by commit() are not in the file yet and are added back.
+            live_ids = [record_id for record_id, _timestamp, _line in kept]
+            oldest = min((item[1] for item in kept), default=None)
+            for record in _line_records(self._pending_history):
+                live_ids.append(str(record.get("id")))
+                oldest = _older(oldest, _parse_utc(record.get("timestamp")))
+            bloom = ScalableBloomFilter()
+            for record_id in live_ids:
+                bloom.add(record_id)
+            live = set(live_ids)
+            for record_id in [i for i in self._recent_ids if i not in live]:
+                del self._recent_ids[record_id]
+            self._history_bloom = bloom
+            self._history_count = len(live_ids)
+            self._history_oldest = oldest
+
+    def _load_history_index(self) -> ScalableBloomFilter:
+        bloom = ScalableBloomFilter()
+        count = 0
+        oldest: datetime | None = None
+        try:
+            with self._config.history_file_path.open("rb") as file:
+                for record in _line_records(file):
+                    record_id = str(record.get("id"))
+                    bloom.add(record_id)
+                    self._remember_id(record_id)
+                    oldest = _older(oldest, _parse_utc(record.get("timestamp")))
+                    count += 1
+        except FileNotFoundError:
+            pass
+        self._history_count = count
+        self._history_oldest = oldest
+        return bloom
+
+    def _remember_id(self, record_id: str) -> None:
+        recent = self._recent_ids
+        recent[record_id] = None
+        recent.move_to_end(record_id)
+        if len(recent) > _RECENT_IDS_LIMIT:
+            recent.popitem(last=False)
+
+    def _history_contains(self, record_id: str) -> bool:
+        """Exact membership check used only to confirm a bloom hit."""
+        if record_id in _line_ids(self._pending_history):
+            return True
+        try:
+            with self._config.history_file_path.open("rb") as file:
+                return any(item == record_id for item in _line_ids(file))
+        except FileNotFoundError:
+            return False
 
     def read_rates_cache(self) -> dict[str, Any]:
-        return self._read_json(self._config.rates_file_path, {"pairs": {}})
+        if self._rates_dirty and self._rates_cache is not None:
+            return self._rates_cache
+
+        path = self._config.rates_file_path
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = 0
+        if self._rates_cache is None or mtime != self._rates_mtime:
+            cache = self._read_json(path, {"pairs": {}})
+            if not isinstance(cache, dict):
+                cache = {"pairs": {}}
+            self._rates_cache = cache
+            self._rates_mtime = mtime
+        return self._rates_cache
+
+    def get_pair(self, pair: str) -> dict[str, Any] | None:
+        """Look up one cached pair; costs a stat() unless the file changed."""
+        pairs = self.read_rates_cache().get("pairs")
+        if not isinstance(pairs, dict):
+            return None
+        entry = pairs.get(pair)
+        return entry if isinstance(entry, dict) else None
+
+    def read_last_refresh(self) -> str | None:
+        # The rates file may be rewritten by other writers (DatabaseManager)
+        # too, so the newer of the two timestamps wins.
+        meta = self._read_json(self._meta_file_path, None)
+        candidates = [
+            str(value)
+            for value in (
+                meta.get("last_refresh") if isinstance(meta, dict) else None,
+                self.read_rates_cache().get("last_refresh"),
+            )
+            if value
+        ]
+        return max(candidates, key=_parse_utc, default=None)
+
+    def commit(
+        self,
+        updates: Mapping[str, PairEntry | dict[str, Any]],
+        records: Iterable[HistoryRecord | dict[str, Any]],
+        last_refresh: str,
+    ) -> tuple[int, int]:
+        """Queue one update cycle: history, rates and last_refresh together.
+
+        The writer appends history first so a crash mid-commit can only lose
+        rates, which the next cycle re-fetches; the directory is synced once
+        per batch. Call flush() to wait until the batch is on disk. A failed
+        background write is re-raised here, after this cycle is queued.
+        Returns ``(updated_count, history_added)``.
+        """
+        lines = self._new_history_lines(records)
+        updated_count = self._merge_rates(updates, last_refresh)
+
+        # Nothing is rewritten unless a pair changed or an earlier write is
+        # still missing (already-written bytes are skipped by digest).
+        files: dict[Path, bytes] = {}
+        if updated_count or self._rates_dirty:
+            files[self._config.rates_file_path] = orjson.dumps(
+                self._rates_cache, option=self._dump_options
+            )
+            files[self._meta_file_path] = orjson.dumps(
+                {"last_refresh": self._rates_cache.get("last_refresh")},
+                option=self._dump_options,
+            )
+        self._enqueue(lines, files)
+        with self._cv:
+            error, self._write_error = self._write_error, None
+        if error is not None:
+            raise error
+        return updated_count, len(lines)
 
     def write_rates_cache(
         self,
-        updates: dict[str, dict[str, Any]],
+        updates: Mapping[str, PairEntry | dict[str, Any]],
+        last_refresh: str,
+    ) -> int:
+        updated_count, _added = self.commit(updates, [], last_refresh)
+        self.flush()
+        return updated_count
+
+    def append_history(
+        self, records: Iterable[HistoryRecord | dict[str, Any]]
+    ) -> int:
+        lines = self._new_history_lines(records)
+        self._enqueue(lines, {})
+        self.flush()
+        return len(lines)
+
+    def flush(self) -> None:
+        """Block until every queued write is on disk; re-raise write errors."""
+        with self._cv:
+            self._cv.wait_for(
+                lambda: not self._writing
+                and not self._pending_history
+                and not self._pending_files
+            )
+            error, self._write_error = self._write_error, None
+        if error is not None:
+            raise error
+
+    def close(self) -> None:
+        """Drain the queue and stop the writer thread; later writes run inline."""
+        with self._cv:
+            if self._closed:
+                return
+            self._closed = True
+            self._cv.notify_all()
+        if self._writer is not threading.current_thread():
+            self._writer.join()
+
+    def _enqueue(self, lines: list[bytes], files: dict[Path, bytes]) -> None:
+        rates_path = self._config.rates_file_path
+        with self._cv:
+            if rates_path in files:
+                self._rates_seq += 1
+            seq = self._rates_seq
+            closed = self._closed
+            if not closed:
+                self._pending_history.extend(lines)
+                self._pending_files.update(files)
+                if rates_path in files:
+                    self._pending_rates_seq = seq
+                self._cv.notify_all()
+        if closed:
+            try:
+                self._write_batch(lines, files)
+            except Exception:
+                with self._cv:
+                    self._forget_history_lines(lines)
+                raise
+            if rates_path in files:
+                self._mark_rates_written(seq)
+
+    def _writer_loop(self) -> None:
+        while True:
+            with self._cv:
+                self._cv.wait_for(
+                    lambda: self._closed
+                    or bool(self._pending_history)
+                    or bool(self._pending_files)
+                )
+                if not self._pending_history and not self._pending_files:
+                    return
+                lines, self._pending_history = self._pending_history, []
+                files, self._pending_files = self._pending_files, {}
+                seq, self._pending_rates_seq = self._pending_rates_seq, 0
+                self._writing = True
+
+            error: Exception | None = None
+            try:
+                self._write_batch(lines, files)
+                if seq:
+                    self._mark_rates_written(seq)
+            except Exception as exc:
+                _logger.error("Background storage write failed: %s", exc)
+                error = exc
+
+            with self._cv:
+                self._writing = False
+                if error is not None:
+                    self._write_error = error
+                    self._forget_history_lines(lines)
+                self._cv.notify_all()
+
+    def _forget_history_lines(self, lines: list[bytes]) -> None:
+        """Undo dedup bookkeeping for lines whose write failed; call under _cv.
+
+        The ids stay in the bloom, but a bloom hit is confirmed against the
+        file, so a re-fetched record missing from disk is written again.
+        """
+        for record_id in _line_ids(lines):
+            self._recent_ids.pop(record_id, None)
+        self._history_count = max(0, self._history_count - len(lines))
+
+    def _write_batch(self, lines: list[bytes], files: dict[Path, bytes]) -> None:
+        self._append_history_lines(lines)
+        for path, data in files.items():
+            self._atomic_write_bytes(path, data, sync_dir=False, skip_if_unchanged=True)
+        if files:
+            _fsync_dir(self._config.rates_file_path.parent)
+
+    def _mark_rates_written(self, seq: int) -> None:
+        with self._cv:
+            # A newer snapshot may already be queued; stay dirty until then.
+            if seq == self._rates_seq:
+                self._rates_mtime = self._config.rates_file_path.stat().st_mtime_ns
+                self._rates_dirty = False
+
+    def _merge_rates(
+        self,
+        updates: Mapping[str, PairEntry | dict[str, Any]],
         last_refresh: str,
     ) -> int:
         cache = self.read_rates_cache()
-        pairs = cache.get("pairs", {})
+        pairs = cache.get("pairs")
         if not isinstance(pairs, dict):
-            pairs = {}
+            pairs = cache["pairs"] = {}
 
         updated_count = 0
         for pair, entry in updates.items():
-            current = pairs.get(pair)
-            if self._should_replace(current, entry):
-                pairs[pair] = entry
+            if isinstance(entry, PairEntry):
+                incoming_updated = entry.updated_at
+            else:
+                incoming_updated = str(entry.get("updated_at", ""))
+            if self._should_replace(pairs.get(pair), incoming_updated):
+                # The cache stays plain dicts for readers; only changed
+                # pairs pay for the conversion.
+                pairs[pair] = (
+                    entry.to_dict() if isinstance(entry, PairEntry) else entry
+                )
                 updated_count += 1
 
-        cache["pairs"] = pairs
-        cache["last_refresh"] = last_refresh
-        self.atomic_write_json(self._config.rates_file_path, cache)
+        if updated_count:
+            cache["last_refresh"] = last_refresh
+            self._rates_dirty = True
         return updated_count
 
-    def append_history(self, records: list[dict[str, Any]]) -> int:
-        history = self._read_json(self._config.history_file_path, [])
-        if not isinstance(history, list):
-            history = []
-
-        existing_ids = {
-            str(item.get("id"))
-            for item in history
-            if isinstance(item, dict)
-        }
-        added = 0
-
-        for record in records:
-            record_id = str(record.get("id", ""))
-            if not record_id or record_id in existing_ids:
-                continue
-            history.append(record)
-            existing_ids.add(record_id)
-            added += 1
-
-        self.atomic_write_json(self._config.history_file_path, history)
-        return added
+    def _new_history_lines(
+        self, records: Iterable[HistoryRecord | dict[str, Any]]
+    ) -> list[bytes]:
+        with self._cv:
+            if self._history_bloom is None:
+                self._history_bloom = self._load_history_index()
+            bloom = self._history_bloom
+
+            lines: list[bytes] = []
+            oldest = self._history_oldest
+            for record in records:
+                if isinstance(record, HistoryRecord):
+                    record_id = record.id
+                    timestamp = record.timestamp
+                else:
+                    record_id = str(record.get("id", ""))
+                    timestamp = record.get("timestamp")
+                if not record_id or record_id in self._recent_ids:
+                    continue
+                if record_id in bloom and self._history_contains(record_id):
+                    continue
+                # orjson encodes slotted dataclasses natively, in field order.
+                lines.append(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+                bloom.add(record_id)
+                self._remember_id(record_id)
+                oldest = _older(oldest, _parse_utc(timestamp))
+            self._history_count += len(lines)
+            self._history_oldest = oldest
+        return lines
+
+    def _append_history_lines(self, lines: list[bytes]) -> None:
+        if not lines:
+            return
+        # History is JSON Lines: new records are appended, never rewritten.
+        with self._config.history_file_path.open("ab") as file:
+            file.writelines(lines)
+            file.flush()
+            os.fsync(file.fileno())
+
+        if self._needs_compaction():
+            self._compact_history()
+
+    def _needs_compaction(self) -> bool:
+        # Compact only once the file is well past the count cap, or holds
+        # records well past the age cutoff, so the rewrite cost is amortized
+        # over many appends. Either limit alone is enough to trigger it.
+        max_records = self._config.history_retention_max_records
+        if max_records > 0 and self._history_count > max_records * 3 // 2:
+            return True
+        max_age_days = self._config.history_retention_max_age_days
+        oldest = self._history_oldest
+        if max_age_days <= 0 or oldest is None:
+            return False
+        cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+        return oldest < cutoff - _AGE_COMPACTION_SLACK
 
     def atomic_write_json(self, path: Path, payload: Any) -> None:
-        path.parent.mkdir(parents=True, exist_ok=True)
+        self._atomic_write_bytes(
+            path, orjson.dumps(payload, option=self._dump_options)
+        )
+
+    def _atomic_write_bytes(
+        self,
+        path: Path,
+        data: bytes,
+        sync_dir: bool = True,
+        skip_if_unchanged: bool = False,
+    ) -> None:
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        if skip_if_unchanged:
+            previous = self._written.get(path)
+            if previous is not None and previous[0] == digest:
+                try:
+                    if path.stat().st_mtime_ns == previous[1]:
+                        return
+                except FileNotFoundError:
+                    pass
 
-        with NamedTemporaryFile(
-            mode="w",
-            encoding="utf-8",
-            delete=False,
-            dir=str(path.parent),
-            prefix=f"{path.name}.tmp.",
-        ) as temp_file:
-            json.dump(payload, temp_file, ensure_ascii=False, indent=2)
-            temp_path = Path(temp_file.name)
+        self._ensure_dir(path.parent)
 
-        temp_path.replace(path)
+        # Per-writer name with O_EXCL; a leftover from a crashed writer with
+        # the same pid/thread id is removed and the create retried once.
+        temp_path = path.with_name(
+            f"{path.name}.tmp.{os.getpid()}.{threading.get_ident()}"
+        )
+        flags = os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0)
+        try:
+            fd = os.open(temp_path, flags, 0o644)
+        except FileExistsError:
+            temp_path.unlink()
+            fd = os.open(temp_path, flags, 0o644)
+
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(data)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        if sync_dir:
+            _fsync_dir(path.parent)
+        self._written[path] = (digest, path.stat().st_mtime_ns)
 
     @staticmethod
     def _read_json(path: Path, default: Any) -> Any:
         try:
-            with path.open("r", encoding="utf-8") as file:
-                return json.load(file)
-        except (FileNotFoundError, json.JSONDecodeError):
+            return orjson.loads(path.read_bytes())
+        except (FileNotFoundError, orjson.JSONDecodeError):
             return default
 
     @staticmethod
     def _should_replace(
         current: dict[str, Any] | None,
-        incoming: dict[str, Any],
+        incoming_updated: str,
     ) -> bool:
         if current is None:
             return True
         current_updated = str(current.get("updated_at", ""))
-        incoming_updated = str(incoming.get("updated_at", ""))
         if not current_updated:
             return True
         if not incoming_updated:
             return False
 
+        # Same-shape UTC timestamps order lexicographically; parse otherwise.
+        suffix = "Z" if current_updated.endswith("Z") else current_updated[-6:]
+        if (
+            suffix in _UTC_SUFFIXES
+            and len(current_updated) == len(incoming_updated)
+            and incoming_updated.endswith(suffix)
+        ):
+            return incoming_updated >= current_updated
+
         try:
             cur_dt = datetime.fromisoformat(current_updated.replace("Z", "+00:00"))
             inc_dt = datetime.fromisoformat(incoming_updated.replace("Z", "+00:00"))
@@ -123,3 +564,50 @@ class ParserStorage:
             inc_dt = inc_dt.replace(tzinfo=timezone.utc)
 
         return inc_dt >= cur_dt
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Persist a rename by syncing its directory entry (POSIX only)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        dir_fd = os.open(str(directory), os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def _line_records(lines: Iterable[bytes]) -> Iterator[dict[str, Any]]:
+    for line in lines:
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            continue
+        if isinstance(record, dict):
+            yield record
+
+
+def _line_ids(lines: Iterable[bytes]) -> Iterator[str]:
+    for record in _line_records(lines):
+        yield str(record.get("id"))
+
+
+def _older(current: datetime | None, candidate: datetime) -> datetime:
+    return candidate if current is None or candidate < current else current
+
+
+_EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def _parse_utc(value: Any) -> datetime:
+    """Parse an ISO timestamp as aware UTC; unparsable values sort first."""
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return _EPOCH
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Any
 
 from valutatrade_hub.core.exceptions import ApiRequestError
 from valutatrade_hub.parser_service.api_clients import BaseApiClient
+from valutatrade_hub.parser_service.records import HistoryRecord, PairEntry
 from valutatrade_hub.parser_service.storage import ParserStorage
 
+_SOURCE_ALIASES = {
+    "coingecko": "CoinGecko",
+    "exchangerate": "ExchangeRate-API",
+}
+
 
 class RatesUpdater:
     def __init__(
@@ -17,54 +24,60 @@ class RatesUpdater:
         logger: logging.Logger,
     ) -> None:
         self._clients = clients
+        self._by_source: dict[str, list[BaseApiClient]] = {}
+        for client in clients:
+            self._by_source.setdefault(client.source_name, []).append(client)
         self._storage = storage
         self._logger = logger
+        # One worker per provider, reused across update cycles.
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, len(clients)),
+            thread_name_prefix="rates-fetch",
+        )
 
     def run_update(self, source: str | None = None) -> dict[str, Any]:
         started = datetime.now(timezone.utc).isoformat()
         self._logger.info("Starting rates update")
 
         selected = self._select_clients(source)
-        combined_updates: dict[str, dict[str, Any]] = {}
-        history_records: list[dict[str, Any]] = []
+        combined_updates: dict[str, PairEntry] = {}
+        history_records: list[HistoryRecord] = []
         errors: list[str] = []
 
-        for client in selected:
+        for client, future in self._fetch_all(selected):
             try:
-                self._logger.info("Fetching from %s", client.source_name)
-                rates = client.fetch_rates()
+                rates = future.result()
+                source_name = client.source_name
+                timestamp = client.last_updated_at
+                fetch_meta = client.last_fetch_meta
                 for pair, rate in rates.items():
-                    entry = {
-                        "rate": float(rate),
-                        "updated_at": client.last_updated_at,
-                        "source": client.source_name,
-                    }
-                    combined_updates[pair] = entry
+                    rate_value = float(rate)
+                    combined_updates[pair] = PairEntry(
+                        rate_value, timestamp, source_name
+                    )
 
                     from_code, to_code = pair.split("_", 1)
-                    timestamp = client.last_updated_at
-                    record_id = f"{from_code}_{to_code}_{timestamp}"
-
                     history_records.append(
-                        {
-                            "id": record_id,
-                            "from_currency": from_code,
-                            "to_currency": to_code,
-                            "rate": float(rate),
-                            "timestamp": timestamp,
-                            "source": client.source_name,
-                            "meta": client.last_fetch_meta.get(pair, {}),
-                        }
+                        HistoryRecord(
+                            f"{pair}_{timestamp}",
+                            from_code,
+                            to_code,
+                            rate_value,
+                            timestamp,
+                            source_name,
+                            fetch_meta.get(pair, {}),
+                        )
                     )
 
-                self._logger.info("%s OK (%d rates)", client.source_name, len(rates))
+                self._logger.info("%s OK (%d rates)", source_name, len(rates))
             except ApiRequestError as exc:
                 message = f"Failed to fetch from {client.source_name}: {exc}"
                 self._logger.error(message)
                 errors.append(message)
 
-        updated_count = self._storage.write_rates_cache(combined_updates, started)
-        history_added = self._storage.append_history(history_records)
+        updated_count, history_added = self._storage.commit(
+            combined_updates, history_records, started
+        )
 
         self._logger.info(
             "Update finished: rates=%d history=%d errors=%d",
@@ -80,24 +93,33 @@ class RatesUpdater:
             "errors": errors,
         }
 
+    def flush(self) -> None:
+        self._storage.flush()
+
+    def close(self) -> None:
+        """Stop the fetch pool, close client sessions and drain storage."""
+        self._pool.shutdown(wait=True)
+        for client in self._clients:
+            client.close()
+        self._storage.close()
+
+    def _fetch_all(
+        self, clients: list[BaseApiClient]
+    ) -> list[tuple[BaseApiClient, Future[dict[str, float]]]]:
+        """Start every fetch at once; results are consumed in client order."""
+        for client in clients:
+            self._logger.info("Fetching from %s", client.source_name)
+        return [(client, self._pool.submit(client.fetch_rates)) for client in clients]
+
     def _select_clients(self, source: str | None) -> list[BaseApiClient]:
         if source is None:
             return self._clients
 
-        normalized = source.strip().lower()
-        mapping = {
-            "coingecko": "CoinGecko",
-            "exchangerate": "ExchangeRate-API",
-        }
-        expected_name = mapping.get(normalized)
+        expected_name = _SOURCE_ALIASES.get(source.strip().lower())
         if expected_name is None:
             raise ValueError("--source должен быть 'coingecko' или 'exchangerate'")
 
-        filtered = [
-            client
-            for client in self._clients
-            if client.source_name == expected_name
-        ]
+        filtered = self._by_source.get(expected_name)
         if not filtered:
             raise ValueError(f"Источник '{source}' не настроен")
         return filtered